@@ -1,11 +1,16 @@
-from flask import Flask
+from flask import Flask, Response, request
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from config import config
+import hmac
+import logging
 import os
 from database import init_db
 from auth.auth_routes import auth_bp
 from routes.resume_routes import resume_bp
+from routes.profile_routes import profile_bp
+from utils.job_queue import init_job_queue
+from utils.metrics import registry
 
 def create_app(config_name='development'):
     app = Flask(__name__)
@@ -13,6 +18,12 @@ def create_app(config_name='development'):
     # Load configuration
     app.config.from_object(config[config_name])
     
+    # key=value log lines are easy to grep and to parse into fields
+    logging.basicConfig(
+        level=app.config['LOG_LEVEL'],
+        format='time=%(asctime)s level=%(levelname)s logger=%(name)s msg="%(message)s"'
+    )
+    
     # Initialize extensions
     CORS(
         app,
@@ -29,15 +40,31 @@ def create_app(config_name='development'):
     # Initialize database
     init_db(app)
     
+    # Start background upload workers
+    init_job_queue(app)
+    
     # Register blueprints
     app.register_blueprint(auth_bp)
     app.register_blueprint(resume_bp)
+    app.register_blueprint(profile_bp)
     
     # Health check
     @app.route('/api/health', methods=['GET'])
     def health():
         return {'status': 'Backend is running'}, 200
     
+    # Prometheus scrape endpoint (per worker process), for holders of
+    # METRICS_TOKEN only
+    @app.route('/api/metrics', methods=['GET'])
+    def metrics():
+        token = app.config['METRICS_TOKEN']
+        if not token:
+            return {'error': 'Not found'}, 404
+        header = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(header.encode(), f'Bearer {token}'.encode()):
+            return {'error': 'Invalid metrics token'}, 401
+        return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+    
     return app
 
 if __name__ == '__main__':
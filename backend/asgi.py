@@ -0,0 +1,259 @@
+"""ASGI entry point
+
+Run with an ASGI server, e.g.:
+    uvicorn asgi:app --port 5002 --workers 4
+
+The read-heavy resume and auth routes and the upload route are served
+by async handlers on pymongo's AsyncMongoClient, so a worker keeps
+accepting requests while queries are in flight. Extraction and scoring
+are CPU-bound and still run on the process pool; the upload handler
+waits on them, and on the sync model code that stores results, from a
+thread so the event loop is never blocked. Every other route is the
+Flask app from create_app, mounted as a WSGI fallback.
+"""
+import functools
+import json
+from contextlib import asynccontextmanager
+import jwt
+from a2wsgi import WSGIMiddleware
+from bson.objectid import ObjectId
+from pymongo import AsyncMongoClient
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.convertors import Convertor, register_url_convertor
+from starlette.datastructures import UploadFile
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Mount, Route
+from app import create_app
+from config import Config
+from database import client_options, get_db
+from models.job_profile import JobProfile
+from models.resume_evaluation import ResumeEvaluation
+from models.rubric_version import RubricVersion
+from models.user import User
+from routes.resume_routes import queue_upload, screen_uploads
+
+flask_app = create_app()
+
+class ObjectIdConvertor(Convertor):
+    """Path segments that are ObjectIds, so /export or /search fall through to Flask"""
+    regex = '[0-9a-fA-F]{24}'
+
+    def convert(self, value):
+        return value
+
+    def to_string(self, value):
+        return str(value)
+
+register_url_convertor('objectid', ObjectIdConvertor())
+
+class Upload:
+    """The parts of a Werkzeug FileStorage the upload helpers use"""
+
+    def __init__(self, upload):
+        self.filename = upload.filename
+        self.stream = upload.file
+
+    def read(self):
+        return self.stream.read()
+
+def jwt_required(endpoint):
+    """Require an access token issued by the Flask app; sets request.state.user_id"""
+    @functools.wraps(endpoint)
+    async def wrapper(request):
+        header = request.headers.get('Authorization', '')
+        if not header.startswith('Bearer '):
+            return JSONResponse({'msg': 'Missing Authorization Header'}, 401)
+        try:
+            claims = jwt.decode(
+                header[len('Bearer '):],
+                flask_app.config['JWT_SECRET_KEY'],
+                algorithms=[flask_app.config.get('JWT_ALGORITHM', 'HS256')]
+            )
+        except jwt.ExpiredSignatureError:
+            return JSONResponse({'msg': 'Token has expired'}, 401)
+        except jwt.InvalidTokenError as e:
+            return JSONResponse({'msg': str(e)}, 422)
+        if claims.get('type') != 'access':
+            return JSONResponse({'msg': 'Only non-refresh tokens are allowed'}, 422)
+        request.state.user_id = claims['sub']
+        return await endpoint(request)
+    return wrapper
+
+def float_arg(request, name):
+    """Query parameter as a float, None if missing or invalid (like Flask's type=float)"""
+    try:
+        return float(request.query_params[name])
+    except (KeyError, ValueError):
+        return None
+
+@jwt_required
+async def get_resumes(request):
+    """Get a page of resumes for current user"""
+    db = request.app.state.db
+
+    sort = request.query_params.get('sort', 'newest')
+    if sort not in ResumeEvaluation.SORT_ORDERS:
+        return JSONResponse({'error': f'Invalid sort: {sort}'}, 400)
+
+    try:
+        limit = min(max(int(request.query_params.get('limit', Config.PAGE_SIZE)), 1), Config.MAX_PAGE_SIZE)
+        query, order = ResumeEvaluation.page_query(
+            request.state.user_id,
+            cursor=request.query_params.get('cursor'),
+            sort=sort,
+            min_score=float_arg(request, 'min_score')
+        )
+    except ValueError as e:
+        return JSONResponse({'error': str(e)}, 400)
+
+    evaluations = await db['resume_evaluations'].find(
+        query, ResumeEvaluation.LIST_PROJECTION
+    ).sort(order).limit(limit + 1).to_list()
+    evaluations, next_cursor = ResumeEvaluation.finish_page(evaluations, limit)
+
+    return JSONResponse({
+        'resumes': [ResumeEvaluation.to_dict(eval) for eval in evaluations],
+        'next_cursor': next_cursor
+    })
+
+@jwt_required
+async def get_top_resumes(request):
+    """Stream the top resumes by a score field"""
+    db = request.app.state.db
+
+    field = request.query_params.get('field', 'overall_score')
+    if ResumeEvaluation.score_path(field) is None:
+        return JSONResponse({'error': f'Invalid score field: {field}'}, 400)
+
+    try:
+        limit = min(max(int(request.query_params.get('limit', 10)), 1), Config.MAX_PAGE_SIZE)
+    except ValueError:
+        return JSONResponse({'error': 'Invalid limit'}, 400)
+
+    query, path = ResumeEvaluation.top_query(request.state.user_id, field, float_arg(request, 'min_score'))
+    cursor = db['resume_evaluations'].find(
+        query, ResumeEvaluation.LIST_PROJECTION
+    ).sort(path, -1).limit(limit)
+
+    async def generate():
+        try:
+            yield '{"field": %s, "resumes": [' % json.dumps(field)
+            index = 0
+            async for evaluation in cursor:
+                yield (',' if index else '') + json.dumps(ResumeEvaluation.to_dict(evaluation))
+                index += 1
+            yield ']}'
+        finally:
+            await cursor.close()
+
+    return StreamingResponse(generate(), media_type='application/json')
+
+@jwt_required
+async def get_resume(request):
+    """Get single resume"""
+    db = request.app.state.db
+
+    evaluation = await db['resume_evaluations'].find_one({
+        '_id': ObjectId(request.path_params['resume_id']),
+        'user_id': ObjectId(request.state.user_id)
+    }, ResumeEvaluation.LIST_PROJECTION)
+
+    if not evaluation:
+        return JSONResponse({'error': 'Resume not found'}, 404)
+
+    return JSONResponse(ResumeEvaluation.to_dict(evaluation))
+
+@jwt_required
+async def upload_resumes(request):
+    """Upload and process multiple resumes"""
+    user_id = request.state.user_id
+    db = request.app.state.db
+
+    if int(request.headers.get('Content-Length') or 0) > Config.MAX_CONTENT_LENGTH:
+        return JSONResponse({'error': 'Upload too large'}, 413)
+
+    async with request.form() as form:
+        files = [Upload(file) for file in form.getlist('files') if isinstance(file, UploadFile)]
+        if not files:
+            return JSONResponse({'error': 'No files provided'}, 400)
+
+        # Score against a stored job profile, or the built-in one
+        profile_id = request.query_params.get('profile_id') or form.get('profile_id')
+        profile = None
+        if profile_id:
+            job_profile = None
+            if ObjectId.is_valid(profile_id):
+                job_profile = await db['job_profiles'].find_one({
+                    '_id': ObjectId(profile_id),
+                    'user_id': ObjectId(user_id)
+                })
+            if not job_profile:
+                return JSONResponse({'error': 'Profile not found'}, 404)
+            profile = JobProfile.definition(job_profile)
+
+        # Writes go through the sync models, off the event loop
+        sync_db = get_db()
+        profile_version = await run_in_threadpool(RubricVersion.record, sync_db, profile)
+
+        if request.query_params.get('mode') == 'async' or form.get('mode') == 'async':
+            response, status = await run_in_threadpool(queue_upload, user_id, files, profile_id, profile)
+        else:
+            response, status = await run_in_threadpool(
+                screen_uploads, sync_db, user_id, files, profile_id, profile, profile_version
+            )
+
+    return JSONResponse(response, status)
+
+@jwt_required
+async def get_current_user(request):
+    """Get current user info"""
+    user_id = request.state.user_id
+
+    user = User.cache.get(user_id)
+    if user is None and ObjectId.is_valid(user_id):
+        user = await request.app.state.db['users'].find_one({'_id': ObjectId(user_id)})
+        if user:
+            user['_id'] = str(user['_id'])
+            User.cache.put(user_id, dict(user))
+
+    if not user:
+        return JSONResponse({'error': 'User not found'}, 404)
+
+    return JSONResponse({
+        'id': str(user['_id']),
+        'email': user['email'],
+        'name': user['name'],
+        'created_at': user['created_at'].isoformat()
+    })
+
+@asynccontextmanager
+async def lifespan(app):
+    client = AsyncMongoClient(Config.MONGO_URI, **client_options())
+    app.state.db = client[Config.MONGO_DB_NAME]
+    try:
+        yield
+    finally:
+        await client.close()
+
+app = Starlette(
+    routes=[
+        Route('/api/resumes', get_resumes, methods=['GET']),
+        Route('/api/resumes/top', get_top_resumes, methods=['GET']),
+        Route('/api/resumes/upload', upload_resumes, methods=['POST']),
+        Route('/api/resumes/{resume_id:objectid}', get_resume, methods=['GET']),
+        Route('/api/auth/me', get_current_user, methods=['GET']),
+        Mount('/', WSGIMiddleware(flask_app))
+    ],
+    # Same policy as the Flask app, for the routes served here
+    middleware=[Middleware(
+        CORSMiddleware,
+        allow_origins=['http://localhost:3000'],
+        allow_credentials=True,
+        allow_methods=['*'],
+        allow_headers=['*']
+    )],
+    lifespan=lifespan
+)
@@ -1,13 +1,23 @@
 from flask import Blueprint, request, jsonify
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask_jwt_extended import jwt_required, get_jwt_identity, create_access_token
 from database import get_db
 from models.user import User
 from auth.jwt_handler import generate_tokens
-from bson.objectid import ObjectId
+from auth.passwords import KdfBusy, hash_password, verify_password, needs_rehash
+from config import Config
+import logging
+
+logger = logging.getLogger(__name__)
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
+@auth_bp.errorhandler(KdfBusy)
+def kdf_busy(error):
+    """Shed auth load instead of queueing when password hashing is saturated"""
+    response = jsonify({'error': 'Too many sign-in requests, try again shortly'})
+    response.headers['Retry-After'] = str(Config.KDF_RETRY_AFTER)
+    return response, 429
+
 @auth_bp.route('/signup', methods=['POST'])
 def signup():
     """User registration"""
@@ -20,11 +30,13 @@ def signup():
     if db['users'].find_one({'email': data['email']}):
         return jsonify({'error': 'Email already registered'}), 409
     
+    password_hash = hash_password(data['password'])
+    
     try:
         user_data = {
             'email': data['email'],
             'name': data.get('name', 'User'),
-            'password': generate_password_hash(data['password']),
+            'password': password_hash,
             'created_at': User.get_current_timestamp(),
             'updated_at': User.get_current_timestamp()
         }
@@ -56,9 +68,16 @@ def login():
     
     user = db['users'].find_one({'email': data['email']})
     
-    if not user or not check_password_hash(user['password'], data['password']):
+    if not user or not verify_password(user['password'], data['password']):
         return jsonify({'error': 'Invalid credentials'}), 401
     
+    # Upgrade hashes made with an older method or cost while the password is at hand
+    try:
+        if needs_rehash(user['password']):
+            User.update(db, user['_id'], {'password': hash_password(data['password'])})
+    except KdfBusy:
+        logger.info('Skipped password rehash for user %s, KDF pool busy', user['_id'])
+    
     tokens = generate_tokens(identity=str(user['_id']))
     return jsonify({
         'message': 'Login successful',
@@ -86,7 +105,7 @@ def get_current_user():
     db = get_db()
     
     try:
-        user = db['users'].find_one({'_id': ObjectId(user_id)})
+        user = User.find_by_id(db, user_id)
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -0,0 +1,73 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, generate_password_hash, check_password_hash
+from config import Config
+from utils.metrics import KDF_REJECTED, KDF_SECONDS
+
+_executor = None
+_executor_pid = None
+_slots = None
+_executor_lock = threading.Lock()
+
+class KdfBusy(Exception):
+    """Raised when the KDF pool and its queue are full"""
+
+def get_executor():
+    """
+    Thread pool for password hashing, created on first use
+
+    hashlib's scrypt and pbkdf2 release the GIL, so KDF_WORKERS threads
+    bound the cores auth can take. Slots cover running and queued work;
+    once they run out, callers are turned away instead of queueing.
+    """
+    global _executor, _executor_pid, _slots
+
+    with _executor_lock:
+        # A pool inherited through fork has no threads in the child
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=Config.KDF_WORKERS, thread_name_prefix='kdf')
+            _slots = threading.BoundedSemaphore(Config.KDF_WORKERS + Config.KDF_MAX_PENDING)
+            _executor_pid = os.getpid()
+        return _executor, _slots
+
+def _run(function, *args):
+    executor, slots = get_executor()
+    if not slots.acquire(blocking=False):
+        KDF_REJECTED.inc()
+        raise KdfBusy()
+
+    def timed():
+        with KDF_SECONDS.time():
+            return function(*args)
+
+    try:
+        future = executor.submit(timed)
+    except Exception:
+        slots.release()
+        raise
+    future.add_done_callback(lambda _: slots.release())
+    return future.result()
+
+def hash_password(password):
+    """Hash a password with the configured method on the KDF pool"""
+    return _run(
+        generate_password_hash, password, Config.PASSWORD_HASH_METHOD, Config.PASSWORD_SALT_LENGTH
+    )
+
+def verify_password(password_hash, password):
+    """Check a password against a stored hash on the KDF pool"""
+    return _run(check_password_hash, password_hash, password)
+
+def method_prefix(method):
+    """Stored-hash prefix of a hash method, with werkzeug's defaults for omitted parameters"""
+    name, *args = method.split(':')
+    if name == 'scrypt' and not args:
+        return 'scrypt:32768:8:1'
+    if name == 'pbkdf2' and len(args) < 2:
+        return f"pbkdf2:{args[0] if args else 'sha256'}:{DEFAULT_PBKDF2_ITERATIONS}"
+    return method
+
+def needs_rehash(password_hash):
+    """Whether a stored hash uses a different method or cost than configured"""
+    return password_hash.split('$', 1)[0] != method_prefix(Config.PASSWORD_HASH_METHOD)
@@ -0,0 +1,129 @@
+"""Synthetic resumes for benchmarks
+
+Resumes are built from a seeded random generator, so the same seed always
+produces the same files. Every resume is distinct, which keeps the
+content-hash result cache from turning a benchmark into a cache test.
+"""
+import io
+import random
+import textwrap
+from docx import Document
+from models.evaluator import ResumeEvaluator
+
+# Approximate words per resume for each size
+SIZES = {'small': 300, 'medium': 1200, 'large': 5000}
+
+FORMATS = ['pdf', 'docx', 'txt']
+
+FIRST_NAMES = ['Asha', 'Ben', 'Carla', 'Dev', 'Elena', 'Farid', 'Grace', 'Hiro', 'Ines', 'Jon']
+LAST_NAMES = ['Patel', 'Smith', 'Garcia', 'Kumar', 'Novak', 'Haddad', 'Lee', 'Tanaka', 'Silva', 'Berg']
+TITLES = ['Software Engineer', 'Data Scientist', 'ML Engineer', 'Backend Developer', 'Research Engineer']
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella Labs', 'Hooli', 'Vandelay Industries']
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+SKILLS = (
+    ResumeEvaluator.AI_ML_KEYWORDS + ResumeEvaluator.LLM_KEYWORDS + ResumeEvaluator.PYTHON_KEYWORDS +
+    ['java', 'kubernetes', 'docker', 'postgresql', 'react', 'aws', 'spark', 'pandas', 'golang', 'terraform']
+)
+
+FILLER = (
+    'built designed led shipped improved reduced latency throughput service platform pipeline '
+    'team customers production scalable reliable data models features api infrastructure '
+    'migrated automated monitoring dashboards stakeholders requirements performance cost '
+    'deployed maintained mentored reviewed architecture experiments analysis reporting'
+).split()
+
+def resume_text(rng, words):
+    """Plain-text resume of roughly the given number of words"""
+    name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+    lines = [
+        name,
+        f'{name.lower().replace(" ", ".")}{rng.randint(1, 999)}@example.com | '
+        f'+1 {rng.randint(200, 999)}-{rng.randint(200, 999)}-{rng.randint(1000, 9999)}',
+        rng.choice(TITLES),
+        '',
+        'Skills: ' + ', '.join(rng.sample(SKILLS, rng.randint(4, 12))),
+        '',
+        'Experience'
+    ]
+
+    count = sum(len(line.split()) for line in lines)
+    year = 2024
+    while count < words:
+        start = year - rng.randint(1, 4)
+        header = (f'{rng.choice(TITLES)}, {rng.choice(COMPANIES)}, '
+                  f'{rng.choice(MONTHS)} {start} - {rng.choice(MONTHS)} {year}')
+        lines.append(header)
+        count += len(header.split())
+        for _ in range(rng.randint(3, 6)):
+            bullet = ' '.join(
+                rng.choice(SKILLS) if rng.random() < 0.15 else rng.choice(FILLER)
+                for _ in range(rng.randint(10, 25))
+            )
+            lines.append('- ' + bullet.capitalize() + '.')
+            count += len(bullet.split())
+        lines.append('')
+        year = start
+
+    return '\n'.join(lines)
+
+def _pdf_escape(line):
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+def to_pdf(text, lines_per_page=55, width=95):
+    """Minimal multi-page PDF (Helvetica text, one content stream per page)"""
+    lines = []
+    for paragraph in text.split('\n'):
+        lines.extend(textwrap.wrap(paragraph, width) or [''])
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    # 1: catalog, 2: pages, 3: font, then a page and a content object per page
+    objects = [None, None, '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    kids = []
+    for page_lines in pages:
+        content = 'BT /F1 10 Tf 50 760 Td 13 TL ' + ' '.join(
+            f"({_pdf_escape(line)}) '" for line in page_lines
+        ) + ' ET'
+        page_number = len(objects) + 1
+        kids.append(f'{page_number} 0 R')
+        objects.append(
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+            f'/Contents {page_number + 1} 0 R /Resources << /Font << /F1 3 0 R >> >> >>'
+        )
+        objects.append(f'<< /Length {len(content)} >>\nstream\n{content}\nendstream')
+    objects[0] = '<< /Type /Catalog /Pages 2 0 R >>'
+    objects[1] = f'<< /Type /Pages /Kids [{" ".join(kids)}] /Count {len(kids)} >>'
+
+    out = b'%PDF-1.4\n'
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f'{number} 0 obj\n{body}\nendobj\n'.encode('latin-1', 'replace')
+    xref = len(out)
+    out += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    out += b''.join(f'{offset:010d} 00000 n \n'.encode() for offset in offsets)
+    out += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode()
+    return out
+
+def to_docx(text):
+    """DOCX with one paragraph per line"""
+    document = Document()
+    for line in text.split('\n'):
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+def to_txt(text):
+    return text.encode('utf-8')
+
+WRITERS = {'pdf': to_pdf, 'docx': to_docx, 'txt': to_txt}
+
+def generate(count, size='small', file_format='txt', seed=0):
+    """List of (filename, bytes, text) for count distinct resumes"""
+    rng = random.Random(f'{seed}-{size}-{file_format}')
+    files = []
+    for index in range(count):
+        text = resume_text(rng, SIZES[size])
+        files.append((f'{size}_{index:04d}.{file_format}', WRITERS[file_format](text), text))
+    return files
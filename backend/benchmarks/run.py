@@ -0,0 +1,238 @@
+"""Benchmarks for the extraction, scoring and upload hot paths
+
+Run from backend/:
+    python -m benchmarks.run [--count 50] [--sizes small,medium,large]
+                             [--stages extract,evaluate,preprocess,upload]
+
+Every stage reports files/sec and p50/p95/p99 latency per resume size
+(and per format where it applies). Results are printed and saved as JSON
+under benchmarks/results/ so runs can be compared.
+
+The upload stage drives POST /api/resumes/upload through the Flask test
+client; its latencies are per request of --batch-size files. It uses mongomock unless --mongo-uri points at a MongoDB server,
+in which case a throwaway database is used and dropped afterwards.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+import numpy as np
+from config import Config
+from benchmarks.generator import FORMATS, SIZES, generate
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+def summarize(latencies, files=None, elapsed=None):
+    """files/sec and latency percentiles (ms) for a list of per-call seconds"""
+    latencies = np.asarray(latencies)
+    files = len(latencies) if files is None else files
+    elapsed = float(latencies.sum()) if elapsed is None else elapsed
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    return {
+        'files': files,
+        'seconds': round(elapsed, 4),
+        'files_per_sec': round(files / elapsed, 2) if elapsed else None,
+        'p50_ms': round(float(p50), 3),
+        'p95_ms': round(float(p95), 3),
+        'p99_ms': round(float(p99), 3),
+        'mean_ms': round(float(latencies.mean()) * 1000, 3)
+    }
+
+def timed(function, items):
+    """Per-item latencies of function over items"""
+    latencies = []
+    for item in items:
+        started = time.perf_counter()
+        function(item)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+def bench_extract(corpus):
+    from utils.pdf_extractor import extract_resume_text
+
+    results = {}
+    for (size, file_format), files in corpus.items():
+        latencies = timed(lambda data: extract_resume_text(data, file_format), [data for _, data, _ in files])
+        results[f'{size}/{file_format}'] = summarize(latencies)
+    return results
+
+def bench_evaluate(corpus):
+    from models.evaluator import ResumeEvaluator
+
+    # Compile the default profile outside the measurement
+    ResumeEvaluator.compile()
+    results = {}
+    for size in {size for size, _ in corpus}:
+        texts = [text for _, _, text in corpus[(size, 'txt')]]
+        results[size] = summarize(timed(ResumeEvaluator.evaluate, texts))
+    return results
+
+def bench_preprocess(corpus):
+    from utils.text_preprocessor import TextPreprocessor
+
+    methods = {
+        'clean_text': TextPreprocessor.clean_text,
+        'tokenize': TextPreprocessor.tokenize,
+        'extract_emails': TextPreprocessor.extract_emails,
+        'extract_phone_numbers': TextPreprocessor.extract_phone_numbers,
+        'analyze': TextPreprocessor.analyze
+    }
+    results = {}
+    for size in {size for size, _ in corpus}:
+        texts = [text for _, _, text in corpus[(size, 'txt')]]
+        for name, method in methods.items():
+            results[f'{size}/{name}'] = summarize(timed(method, texts))
+    return results
+
+def bench_upload(corpus, batch_size, mongo_uri=None):
+    import database
+
+    workdir = tempfile.mkdtemp(prefix='resume-bench-')
+    Config.UPLOAD_FOLDER = os.path.join(workdir, 'uploads')
+    Config.JOB_DB_PATH = os.path.join(workdir, 'jobs.sqlite3')
+    Config.RESULT_CACHE_PERSIST = False
+
+    if mongo_uri:
+        Config.MONGO_URI = mongo_uri
+        Config.MONGO_DB_NAME = f'resume_screening_bench_{os.getpid()}'
+    else:
+        import mongomock
+        from tests.mongomock_support import patch_mongomock
+        patch_mongomock()
+        Config.MONGO_URI = 'mongodb://localhost:27017'
+        database.MongoClient = mongomock.MongoClient
+    database.mongo.close()
+
+    from app import create_app
+    app = create_app()
+    app.config['TESTING'] = True
+    client = app.test_client()
+
+    # mongomock indexes only add uniqueness checks, which scan the collection
+    if mongo_uri:
+        database.mongo.create_indexes()
+    response = client.post('/api/auth/signup', json={
+        'email': 'bench@example.com', 'password': 'benchmark', 'name': 'Bench'
+    })
+    headers = {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+    results = {}
+    try:
+        for (size, file_format), files in corpus.items():
+            # Start every case from an empty pool so cases are comparable
+            for name in ['resume_evaluations', 'resume_postings', 'resume_texts']:
+                database.mongo.db[name].delete_many({})
+
+            latencies = []
+            started = time.perf_counter()
+            for start in range(0, len(files), batch_size):
+                batch = files[start:start + batch_size]
+                request_started = time.perf_counter()
+                response = client.post(
+                    '/api/resumes/upload',
+                    data={'files': [(io.BytesIO(data), filename) for filename, data, _ in batch]},
+                    headers=headers,
+                    content_type='multipart/form-data'
+                )
+                latencies.append(time.perf_counter() - request_started)
+                if response.status_code != 200:
+                    raise RuntimeError(f'Upload failed ({response.status_code}): {response.get_data(as_text=True)}')
+            results[f'{size}/{file_format}'] = {
+                **summarize(latencies, files=len(files), elapsed=time.perf_counter() - started),
+                'batch_size': batch_size
+            }
+    finally:
+        if mongo_uri:
+            database.mongo.client.drop_database(Config.MONGO_DB_NAME)
+    return results
+
+STAGES = ['extract', 'evaluate', 'preprocess', 'upload']
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+def print_results(results):
+    print(f"{'stage':<12}{'case':<34}{'files/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for stage, cases in results.items():
+        for case, stats in sorted(cases.items()):
+            print(f"{stage:<12}{case:<34}{stats['files_per_sec'] or 0:>10.1f}"
+                  f"{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark resume processing hot paths')
+    parser.add_argument('--count', type=int, default=50, help='Resumes per size and format')
+    parser.add_argument('--sizes', default=','.join(SIZES), help=f"Comma-separated, from {', '.join(SIZES)}")
+    parser.add_argument('--formats', default=','.join(FORMATS), help=f"Comma-separated, from {', '.join(FORMATS)}")
+    parser.add_argument('--stages', default=','.join(STAGES), help=f"Comma-separated, from {', '.join(STAGES)}")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--batch-size', type=int, default=10, help='Files per upload request')
+    parser.add_argument('--mongo-uri', help='Benchmark uploads against this MongoDB instead of mongomock')
+    parser.add_argument('--output', help='JSON file to write (default: benchmarks/results/<timestamp>.json)')
+    args = parser.parse_args()
+
+    sizes = [size for size in args.sizes.split(',') if size]
+    formats = [file_format for file_format in args.formats.split(',') if file_format]
+    stages = [stage for stage in args.stages.split(',') if stage]
+    for value, known in [(sizes, SIZES), (formats, FORMATS), (stages, STAGES)]:
+        unknown = set(value) - set(known)
+        if unknown:
+            parser.error(f"Unknown value(s): {', '.join(sorted(unknown))}")
+
+    # Text-only stages always need the txt corpus
+    corpus_formats = sorted(set(formats) | {'txt'})
+    started = time.perf_counter()
+    corpus = {
+        (size, file_format): generate(args.count, size, file_format, args.seed)
+        for size in sizes for file_format in corpus_formats
+    }
+    print(f"Generated {sum(len(files) for files in corpus.values())} resumes "
+          f"in {time.perf_counter() - started:.1f}s")
+
+    selected = {key: files for key, files in corpus.items() if key[1] in formats}
+    results = {}
+    if 'extract' in stages:
+        results['extract'] = bench_extract(selected)
+    if 'evaluate' in stages:
+        results['evaluate'] = bench_evaluate(corpus)
+    if 'preprocess' in stages:
+        results['preprocess'] = bench_preprocess(corpus)
+    if 'upload' in stages:
+        results['upload'] = bench_upload(selected, args.batch_size, args.mongo_uri)
+
+    print_results(results)
+
+    report = {
+        'created_at': datetime.utcnow().isoformat(),
+        'revision': git_revision(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'pipeline_workers': Config.PIPELINE_WORKERS,
+        'options': {
+            'count': args.count, 'sizes': sizes, 'formats': formats,
+            'seed': args.seed, 'batch_size': args.batch_size,
+            'mongo': 'server' if args.mongo_uri else 'mongomock'
+        },
+        'results': results
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved {output}")
+
+if __name__ == '__main__':
+    main()
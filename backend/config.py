@@ -8,19 +8,91 @@ class Config:
     # App Config
     FLASK_ENV = os.getenv('FLASK_ENV', 'development')
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key')
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    # Bearer token a scraper must send to GET /api/metrics; the endpoint
+    # is disabled while this is unset
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
     
     # MongoDB
     MONGO_URI = os.getenv('MONGO_URI',"")
+    MONGO_DB_NAME = os.getenv('MONGO_DB_NAME', 'resume_screening')
+    # Connection pool per worker process (timeouts in ms, 0 means none)
+    MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', 100))
+    MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', 0))
+    MONGO_MAX_IDLE_TIME_MS = int(os.getenv('MONGO_MAX_IDLE_TIME_MS', 0))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', 0))
+    MONGO_CONNECT_TIMEOUT_MS = int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', 20000))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', 30000))
+    MONGO_SOCKET_TIMEOUT_MS = int(os.getenv('MONGO_SOCKET_TIMEOUT_MS', 0))
     
     # JWT
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'jwt-secret-key')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
     
+    # Password hashing (a werkzeug method, e.g. scrypt:32768:8:1 or
+    # pbkdf2:sha256:1000000); stored hashes are upgraded on login
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    PASSWORD_SALT_LENGTH = int(os.getenv('PASSWORD_SALT_LENGTH', 16))
+    # Threads hashing passwords per process, and requests allowed to wait
+    # for one; beyond that auth answers 429 with Retry-After KDF_RETRY_AFTER
+    KDF_WORKERS = int(os.getenv('KDF_WORKERS', 2))
+    KDF_MAX_PENDING = int(os.getenv('KDF_MAX_PENDING', 8))
+    KDF_RETRY_AFTER = int(os.getenv('KDF_RETRY_AFTER', 1))
+    
+    # User lookups cached per process (TTL in seconds)
+    USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', 1024))
+    USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', 60))
+    
     # File Upload
     UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', 'uploads')
     MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', 16777216))
     ALLOWED_EXTENSIONS = os.getenv('ALLOWED_EXTENSIONS', 'pdf,docx,txt').split(',')
+    # Uploads larger than this are spooled to UPLOAD_FOLDER instead of memory
+    UPLOAD_SPOOL_MAX_SIZE = int(os.getenv('UPLOAD_SPOOL_MAX_SIZE', 4194304))
+    
+    # Listing
+    PAGE_SIZE = int(os.getenv('PAGE_SIZE', 50))
+    MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', 500))
+    # Documents fetched per round trip when streaming an export
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 500))
+    
+    # Processing pipeline (0 or 1 processes files inline)
+    PIPELINE_WORKERS = int(os.getenv('PIPELINE_WORKERS', os.cpu_count() or 1))
+    # Extraction limits per resume (0 means no limit)
+    EXTRACT_MAX_PAGES = int(os.getenv('EXTRACT_MAX_PAGES', 0))
+    EXTRACT_MAX_CHARS = int(os.getenv('EXTRACT_MAX_CHARS', 0))
+    
+    # Background upload jobs
+    JOB_DB_PATH = os.getenv('JOB_DB_PATH', 'jobs.sqlite3')
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))
+    JOB_LEASE_SECONDS = int(os.getenv('JOB_LEASE_SECONDS', 300))
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 3))
+    # Finished jobs and their results are deleted after this long (0 keeps them)
+    JOB_RETENTION_SECONDS = int(os.getenv('JOB_RETENTION_SECONDS', 7 * 24 * 3600))
+    
+    # Content-hash cache of extracted text and scores
+    RESULT_CACHE_SIZE = int(os.getenv('RESULT_CACHE_SIZE', 256))
+    RESULT_CACHE_PERSIST = os.getenv('RESULT_CACHE_PERSIST', 'false').lower() == 'true'
+    
+    # Duplicate candidates: MinHash signature length and LSH bands (it must
+    # divide evenly; re-run manage.py index-candidates after changing
+    # either), the similarity that counts as a duplicate, the lower one
+    # that does for resumes sharing an email or phone number, and how many
+    # stored resumes each uploaded resume is compared against at most
+    MINHASH_PERMUTATIONS = int(os.getenv('MINHASH_PERMUTATIONS', 64))
+    MINHASH_BANDS = int(os.getenv('MINHASH_BANDS', 16))
+    DUPLICATE_SIMILARITY = float(os.getenv('DUPLICATE_SIMILARITY', 0.8))
+    DUPLICATE_CONTACT_SIMILARITY = float(os.getenv('DUPLICATE_CONTACT_SIMILARITY', 0.3))
+    DUPLICATE_MAX_CANDIDATES = int(os.getenv('DUPLICATE_MAX_CANDIDATES', 500))
+    
+    # Per-user TF-IDF matrices kept in memory for job description matching
+    TFIDF_MATRIX_CACHE_SIZE = int(os.getenv('TFIDF_MATRIX_CACHE_SIZE', 32))
+    
+    # Search postings of new uploads are written in the background, in
+    # batches of up to this many, at least this often
+    SEARCH_INDEX_BATCH_SIZE = int(os.getenv('SEARCH_INDEX_BATCH_SIZE', 5000))
+    SEARCH_INDEX_FLUSH_SECONDS = float(os.getenv('SEARCH_INDEX_FLUSH_SECONDS', 1))
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -1,45 +1,100 @@
 from pymongo import MongoClient
 from config import Config
+from models.resume_evaluation import ResumeEvaluation
+from utils.metrics import CommandMetrics
 import os
+import threading
+
+def client_options():
+    """Keyword arguments shared by the sync and async MongoDB clients"""
+    return {
+        'tlsAllowInvalidCertificates': True,
+        'maxPoolSize': Config.MONGO_MAX_POOL_SIZE,
+        'minPoolSize': Config.MONGO_MIN_POOL_SIZE,
+        'maxIdleTimeMS': Config.MONGO_MAX_IDLE_TIME_MS or None,
+        'waitQueueTimeoutMS': Config.MONGO_WAIT_QUEUE_TIMEOUT_MS or None,
+        'connectTimeoutMS': Config.MONGO_CONNECT_TIMEOUT_MS,
+        'serverSelectionTimeoutMS': Config.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        'socketTimeoutMS': Config.MONGO_SOCKET_TIMEOUT_MS or None,
+        'event_listeners': [CommandMetrics()]
+    }
 
 class MongoDB:
+    """Lazily created MongoClient, one per process
+
+    The client is created on first use rather than at import, and again
+    in a forked worker (e.g. gunicorn --preload), since a client must not
+    be shared across fork.
+    """
     _instance = None
     _client = None
     _db = None
+    _pid = None
+    _lock = threading.Lock()
     
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(MongoDB, cls).__new__(cls)
         return cls._instance
     
-    def __init__(self):
-        if self._client is None:
-            print("Config.MONGO_URI",Config.MONGO_URI)
-            self._client = MongoClient(Config.MONGO_URI, tlsAllowInvalidCertificates=True)
-            self._db = self._client['resume_screening']
-            self._create_indexes()
+    def _connect(self):
+        with self._lock:
+            if self._client is None or self._pid != os.getpid():
+                # A client inherited from the parent is abandoned, not closed:
+                # closing it would tear down sockets the parent still uses
+                self._client = MongoClient(Config.MONGO_URI, **client_options())
+                self._db = self._client[Config.MONGO_DB_NAME]
+                self._pid = os.getpid()
     
-    def _create_indexes(self):
-        """Create necessary indexes"""
-        self._db['users'].create_index('email', unique=True)
-        self._db['resume_evaluations'].create_index('user_id')
-        self._db['resume_evaluations'].create_index('created_at')
+    def create_indexes(self):
+        """Create necessary indexes (run via manage.py create-indexes)"""
+        self.db['users'].create_index('email', unique=True)
+        self.db['resume_evaluations'].create_index('user_id')
+        self.db['resume_evaluations'].create_index('created_at')
+        self.db['resume_evaluations'].create_index(
+            [('user_id', 1), ('created_at', -1), ('_id', -1)]
+        )
+        self.db['job_profiles'].create_index('user_id')
+        # Sorted posting lists for resume search
+        self.db['resume_postings'].create_index(
+            [('user_id', 1), ('term', 1), ('evaluation_id', 1)], unique=True
+        )
+        self.db['resume_postings'].create_index('evaluation_id')
+        # Stored TF-IDF vectors of the active model, newest last
+        self.db['resume_evaluations'].create_index(
+            [('user_id', 1), ('tfidf.version', 1), ('_id', -1)]
+        )
+        self.db['tfidf_models'].create_index('created_at')
+        # Duplicate candidates by contact details and MinHash LSH band
+        for path in ['contact.emails', 'contact.phones', 'minhash.bands']:
+            self.db['resume_evaluations'].create_index([('user_id', 1), (path, 1)])
+        # Ranked shortlists per score field
+        for field in ['overall_score'] + ResumeEvaluation.SCORE_FIELDS:
+            self.db['resume_evaluations'].create_index(
+                [('user_id', 1), (ResumeEvaluation.score_path(field), -1)]
+            )
     
     @property
     def db(self):
+        if self._client is None or self._pid != os.getpid():
+            self._connect()
         return self._db
     
     @property
     def client(self):
+        if self._client is None or self._pid != os.getpid():
+            self._connect()
         return self._client
     
     def close(self):
-        if self._client:
-            self._client.close()
+        with self._lock:
+            if self._client and self._pid == os.getpid():
+                self._client.close()
             self._client = None
             self._db = None
+            self._pid = None
 
-# Global MongoDB instance
+# Global MongoDB instance; connects on first use
 mongo = MongoDB()
 
 def init_db(app):
@@ -0,0 +1,401 @@
+"""Maintenance commands
+
+Usage:
+    python manage.py create-indexes
+    python manage.py rescore --profile <id|default> [--user <id>]
+    python manage.py rescore-pool --profile <id> [--profile default] [--user <id>]
+    python manage.py build-search-index [--user <id>]
+    python manage.py fit-tfidf [--min-df 2] [--max-terms 50000]
+    python manage.py migrate-resume-text
+    python manage.py index-candidates [--user <id>]
+"""
+import argparse
+import time
+from datetime import datetime
+from bson.objectid import ObjectId
+from pymongo import UpdateMany, UpdateOne
+from database import get_db, mongo
+from models.batch_scorer import BatchScorer
+from models.candidate_index import CandidateIndex
+from models.evaluator import ResumeEvaluator
+from models.job_profile import JobProfile
+from models.resume_text import ResumeText
+from models.rubric_version import RubricVersion
+from models.search_index import SearchIndex
+from models.tfidf import TfidfModel
+from utils.text_preprocessor import TextPreprocessor
+
+def create_indexes(args):
+    """Create the MongoDB indexes the app relies on (safe to re-run)"""
+    started = time.perf_counter()
+    mongo.create_indexes()
+    print(f"Indexes created in {time.perf_counter() - started:.1f}s")
+
+# Text reference, or embedded text on documents not yet migrated
+TEXT_FIELDS = {'text_hash': 1, 'resume_text': 1}
+
+def rescore_evaluations(args):
+    """
+    Bring evaluations scored with an older version of a profile up to date.
+
+    Scores are recomputed from the stored keyword hits and years of
+    experience. Only documents whose analysis lacks a keyword the new
+    rubric needs (a new keyword or changed spellings) have their text
+    rescanned, and only documents whose hits or scores changed are
+    rewritten; the rest get the new version in one update per batch.
+    """
+    db = get_db()
+
+    if args.profile == 'default':
+        profile_id, profile = None, None
+    else:
+        job_profiles = JobProfile.find_many(db, [args.profile])
+        if not job_profiles:
+            raise SystemExit(f"Profile not found: {args.profile}")
+        profile_id, profile = job_profiles[0]['_id'], JobProfile.definition(job_profiles[0])
+
+    version = RubricVersion.record(db, profile)
+    keywords = {
+        keyword
+        for category_keywords in ResumeEvaluator.compile(profile).matcher.categories.values()
+        for keyword in category_keywords
+    }
+    query = {'profile_id': profile_id, 'profile_version': {'$ne': version}}
+    if args.user:
+        query['user_id'] = ObjectId(args.user)
+
+    collection = db['resume_evaluations']
+    cursor = collection.find(query, {
+        'profile_version': 1, 'hits': 1, 'experience_years': 1, 'scores': 1, 'overall_score': 1
+    }).batch_size(args.batch_size)
+
+    snapshots = {}
+    rescans = {}
+    totals = {'scanned': 0, 'rewritten': 0, 'rescanned': 0}
+    started = time.perf_counter()
+
+    def needs_text(document):
+        old_version = document.get('profile_version')
+        if document.get('hits') is None or document.get('experience_years') is None:
+            return True
+        if old_version not in snapshots:
+            snapshots.update(RubricVersion.find_many(db, [old_version]))
+        if old_version not in snapshots:
+            return True
+        if old_version not in rescans:
+            rescans[old_version] = ResumeEvaluator.rescan_keywords(snapshots[old_version], profile)
+        return bool(rescans[old_version])
+
+    def flush(batch):
+        rescan = [document for document in batch if needs_text(document)]
+        if rescan:
+            texts = {
+                document['_id']: document.get('resume_text') or ''
+                for document in ResumeText.attach(db, list(collection.find(
+                    {'_id': {'$in': [document['_id'] for document in rescan]}}, TEXT_FIELDS
+                )))
+            }
+            for document in rescan:
+                document['stored'] = {
+                    'hits': document.get('hits'), 'experience_years': document.get('experience_years')
+                }
+                document.update(ResumeEvaluator.analyze(texts.get(document['_id'], ''), profile))
+
+        now = datetime.utcnow()
+        writes = []
+        unchanged = []
+        for document in batch:
+            # Keep only hits on keywords this rubric still has
+            hits = sorted(keywords.intersection(document['hits']))
+            analysis = {'hits': hits, 'experience_years': document['experience_years']}
+            scores = ResumeEvaluator.score(analysis, profile)
+            overall_score = scores.pop('overall_score')
+            # Unchanged findings and scores only need the new version
+            stored = document.get('stored', document)
+            if (hits == stored.get('hits') and analysis['experience_years'] == stored.get('experience_years')
+                    and scores == document.get('scores') and overall_score == document.get('overall_score')):
+                unchanged.append(document['_id'])
+                continue
+            writes.append(UpdateOne({'_id': document['_id']}, {'$set': {
+                'scores': scores,
+                'overall_score': overall_score,
+                **analysis,
+                'profile_version': version,
+                'updated_at': now
+            }}))
+
+        if unchanged:
+            writes.append(UpdateMany(
+                {'_id': {'$in': unchanged}}, {'$set': {'profile_version': version}}
+            ))
+        if writes:
+            collection.bulk_write(writes, ordered=False)
+
+        totals['scanned'] += len(batch)
+        totals['rewritten'] += len(batch) - len(unchanged)
+        totals['rescanned'] += len(rescan)
+
+    for batch in batches(cursor, args.batch_size):
+        flush(batch)
+        elapsed = time.perf_counter() - started
+        print(f"{totals['scanned']} evaluations checked, {totals['rewritten']} rewritten, "
+              f"{totals['rescanned']} rescanned ({totals['scanned'] / elapsed:.0f}/s)")
+
+    elapsed = time.perf_counter() - started
+    print(f"Done: {totals['scanned']} evaluations checked, {totals['rewritten']} rewritten, "
+          f"{totals['rescanned']} rescanned in {elapsed:.1f}s "
+          f"({totals['scanned'] / elapsed if elapsed else 0:.0f}/s)")
+
+def batches(cursor, batch_size):
+    """Lists of up to batch_size documents from a cursor"""
+    batch = []
+    for document in cursor:
+        batch.append(document)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def rescore_pool(args):
+    """Re-score stored resumes against job profiles into profile_scores.<id>"""
+    db = get_db()
+
+    profiles = {}
+    profile_ids = [profile_id for profile_id in args.profile if profile_id != 'default']
+    if len(profile_ids) < len(args.profile):
+        profiles['default'] = None
+    for profile in JobProfile.find_many(db, profile_ids):
+        profiles[str(profile['_id'])] = JobProfile.definition(profile)
+
+    missing = set(profile_ids) - set(profiles)
+    if missing:
+        raise SystemExit(f"Profiles not found: {', '.join(sorted(missing))}")
+
+    scorer = BatchScorer(profiles)
+    versions = {profile_id: compiled.version for profile_id, compiled in scorer.profiles.items()}
+
+    query = {'user_id': ObjectId(args.user)} if args.user else {}
+    cursor = db['resume_evaluations'].find(query, TEXT_FIELDS).batch_size(args.batch_size)
+
+    total = 0
+    started = time.perf_counter()
+
+    def flush(batch):
+        results = scorer.score([document.get('resume_text') or '' for document in batch])
+        now = datetime.utcnow()
+        db['resume_evaluations'].bulk_write([
+            UpdateOne({'_id': document['_id']}, {'$set': {
+                f'profile_scores.{profile_id}': {
+                    **scores[profile_id],
+                    'version': versions[profile_id],
+                    'scored_at': now
+                }
+                for profile_id in profiles
+            }})
+            for document, scores in zip(batch, results)
+        ], ordered=False)
+
+    for batch in ResumeText.iter_batches(cursor, db, args.batch_size):
+        flush(batch)
+        total += len(batch)
+        elapsed = time.perf_counter() - started
+        print(f"{total} resumes re-scored ({total / elapsed:.0f}/s)")
+
+    elapsed = time.perf_counter() - started
+    print(f"Done: {total} resumes x {len(profiles)} profiles in {elapsed:.1f}s "
+          f"({total / elapsed if elapsed else 0:.0f} resumes/s)")
+
+def build_search_index(args):
+    """Rebuild the resume search index from stored resume text"""
+    db = get_db()
+
+    query = {'user_id': ObjectId(args.user)} if args.user else {}
+    if args.user:
+        SearchIndex.remove_user(db, args.user)
+    else:
+        db[SearchIndex.COLLECTION].delete_many({})
+
+    cursor = db['resume_evaluations'].find(query, {'user_id': 1, **TEXT_FIELDS}).batch_size(args.batch_size)
+
+    total = 0
+    started = time.perf_counter()
+    for batch in ResumeText.iter_batches(cursor, db, args.batch_size):
+        # One insert per user and batch
+        by_user = {}
+        for document in batch:
+            by_user.setdefault(document['user_id'], []).append((document['_id'], document.get('resume_text')))
+        for user_id, documents in by_user.items():
+            SearchIndex.add(db, user_id, documents)
+        total += len(batch)
+        print(f"{total} resumes indexed ({total / (time.perf_counter() - started):.0f}/s)")
+
+    print(f"Done: {total} resumes indexed in {time.perf_counter() - started:.1f}s")
+
+def fit_tfidf(args):
+    """Fit a TF-IDF model on all stored resumes and re-vectorize them"""
+    db = get_db()
+    collection = db['resume_evaluations']
+
+    started = time.perf_counter()
+    texts = (
+        document.get('resume_text') or ''
+        for batch in ResumeText.iter_batches(
+            collection.find({}, TEXT_FIELDS).batch_size(args.batch_size), db, args.batch_size
+        )
+        for document in batch
+    )
+    model = TfidfModel.fit(texts, min_df=args.min_df, max_terms=args.max_terms)
+    print(f"Fitted {len(model.terms)} terms in {time.perf_counter() - started:.1f}s")
+
+    # New vectors go to tfidf_next while the old model is still active, so
+    # matching keeps comparing vectors of a single model
+    total = 0
+    started = time.perf_counter()
+    cursor = collection.find({}, TEXT_FIELDS).batch_size(args.batch_size)
+    for batch in ResumeText.iter_batches(cursor, db, args.batch_size):
+        collection.bulk_write([
+            UpdateOne(
+                {'_id': document['_id']},
+                {'$set': {'tfidf_next': model.stored_vector(document.get('resume_text'))}}
+            )
+            for document in batch
+        ], ordered=False)
+        total += len(batch)
+        print(f"{total} resumes vectorized ({total / (time.perf_counter() - started):.0f}/s)")
+
+    # Activate the model, then swap the new vectors in with one update
+    model.save(db)
+    collection.update_many(
+        {'tfidf_next.version': model.version},
+        [{'$set': {'tfidf': '$tfidf_next'}}, {'$project': {'tfidf_next': 0}}]
+    )
+
+    # Resumes uploaded during the run were vectorized with the old model
+    caught_up = 0
+    cursor = collection.find(
+        {'tfidf.version': {'$ne': model.version}}, TEXT_FIELDS
+    ).batch_size(args.batch_size)
+    for batch in ResumeText.iter_batches(cursor, db, args.batch_size):
+        collection.bulk_write([
+            UpdateOne(
+                {'_id': document['_id']},
+                {'$set': {'tfidf': model.stored_vector(document.get('resume_text'))},
+                 '$unset': {'tfidf_next': ''}}
+            )
+            for document in batch
+        ], ordered=False)
+        caught_up += len(batch)
+
+    print(f"Done: model {model.version}, {total} resumes vectorized "
+          f"(+{caught_up} uploaded during the run) in {time.perf_counter() - started:.1f}s")
+
+def migrate_resume_text(args):
+    """Move text embedded in evaluations and cache entries into resume_texts"""
+    db = get_db()
+
+    for name in ['resume_evaluations', 'resume_cache']:
+        collection = db[name]
+        cursor = collection.find(
+            {'resume_text': {'$exists': True}}, {'resume_text': 1}
+        ).batch_size(args.batch_size)
+
+        total = 0
+        started = time.perf_counter()
+        batch = []
+
+        def flush(batch):
+            hashes = ResumeText.store_many(db, [document['resume_text'] for document in batch])
+            collection.bulk_write([
+                UpdateOne(
+                    {'_id': document['_id']},
+                    {'$set': {'text_hash': text_hash}, '$unset': {'resume_text': ''}}
+                )
+                for document, text_hash in zip(batch, hashes)
+            ], ordered=False)
+
+        for document in cursor:
+            batch.append(document)
+            if len(batch) >= args.batch_size:
+                flush(batch)
+                total += len(batch)
+                batch = []
+                print(f"{name}: {total} documents migrated ({total / (time.perf_counter() - started):.0f}/s)")
+        if batch:
+            flush(batch)
+            total += len(batch)
+
+        print(f"{name}: done, {total} documents migrated in {time.perf_counter() - started:.1f}s")
+
+def index_candidates(args):
+    """Store contact details and MinHash signatures on existing evaluations"""
+    db = get_db()
+    collection = db['resume_evaluations']
+
+    query = {'user_id': ObjectId(args.user)} if args.user else {}
+    cursor = collection.find(query, TEXT_FIELDS).batch_size(args.batch_size)
+
+    total = 0
+    started = time.perf_counter()
+    for batch in ResumeText.iter_batches(cursor, db, args.batch_size):
+        updates = []
+        for document in batch:
+            analyzed = TextPreprocessor.analyze(document.get('resume_text') or '')
+            fields = CandidateIndex.fields(analyzed, SearchIndex.tokens_to_terms(analyzed['tokens']))
+            update = {'$set': fields}
+            if 'minhash' not in fields:
+                update['$unset'] = {'minhash': ''}
+            updates.append(UpdateOne({'_id': document['_id']}, update))
+        collection.bulk_write(updates, ordered=False)
+        total += len(batch)
+        print(f"{total} resumes indexed ({total / (time.perf_counter() - started):.0f}/s)")
+
+    print(f"Done: {total} resumes indexed in {time.perf_counter() - started:.1f}s")
+
+def main():
+    parser = argparse.ArgumentParser(description='Resume screening maintenance commands')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    indexes = commands.add_parser('create-indexes', help='Create MongoDB indexes')
+    indexes.set_defaults(func=create_indexes)
+
+    update = commands.add_parser('rescore', help='Re-score evaluations after a rubric change')
+    update.add_argument('--profile', required=True,
+                        help="Job profile ID, or 'default' for the built-in profile")
+    update.add_argument('--user', help='Only re-score this user\'s evaluations')
+    update.add_argument('--batch-size', type=int, default=500)
+    update.set_defaults(func=rescore_evaluations)
+
+    rescore = commands.add_parser('rescore-pool', help='Re-score stored resumes against job profiles')
+    rescore.add_argument('--profile', action='append', required=True,
+                         help="Job profile ID, or 'default' for the built-in profile (repeatable)")
+    rescore.add_argument('--user', help='Only re-score this user\'s resumes')
+    rescore.add_argument('--batch-size', type=int, default=500)
+    rescore.set_defaults(func=rescore_pool)
+
+    index = commands.add_parser('build-search-index', help='Rebuild the resume search index')
+    index.add_argument('--user', help='Only rebuild this user\'s resumes')
+    index.add_argument('--batch-size', type=int, default=500)
+    index.set_defaults(func=build_search_index)
+
+    tfidf = commands.add_parser('fit-tfidf', help='Fit the TF-IDF model used for job description matching')
+    tfidf.add_argument('--min-df', type=int, default=2, help='Ignore terms found in fewer resumes')
+    tfidf.add_argument('--max-terms', type=int, default=50000, help='Keep only the most common terms')
+    tfidf.add_argument('--batch-size', type=int, default=500)
+    tfidf.set_defaults(func=fit_tfidf)
+
+    migrate = commands.add_parser('migrate-resume-text', help='Move embedded resume text into resume_texts')
+    migrate.add_argument('--batch-size', type=int, default=500)
+    migrate.set_defaults(func=migrate_resume_text)
+
+    candidates = commands.add_parser('index-candidates',
+                                     help='Index contact details and MinHash signatures for duplicate detection')
+    candidates.add_argument('--user', help='Only index this user\'s resumes')
+    candidates.add_argument('--batch-size', type=int, default=500)
+    candidates.set_defaults(func=index_candidates)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,5 @@
 from .user import User
 from .resume_evaluation import ResumeEvaluation
+from .job_profile import JobProfile
 
-__all__ = ['User', 'ResumeEvaluation']
\ No newline at end of file
+__all__ = ['User', 'ResumeEvaluation', 'JobProfile']
\ No newline at end of file
@@ -0,0 +1,132 @@
+import numpy as np
+from scipy import sparse
+from models.evaluator import ResumeEvaluator
+from utils.keyword_matcher import KeywordMatcher
+
+class BatchScorer:
+    """Score many resumes against many job profiles in one pass
+
+    Every spelling of every profile is compiled into a single matcher,
+    so each resume is scanned once however many profiles there are; the
+    matcher reports overlapping matches, so one profile's spelling cannot
+    hide another's. Found spellings form a sparse document-surface
+    matrix, and sparse products map surfaces to each profile's keywords
+    and keywords to categories for all profiles at once.
+    """
+
+    def __init__(self, profiles):
+        """
+        profiles: mapping of profile ID -> profile definition (None for
+        the built-in profile)
+        """
+        self.profiles = {
+            profile_id: ResumeEvaluator.compile(definition)
+            for profile_id, definition in profiles.items()
+        }
+
+        # Rows: surfaces of all profiles; columns of the surface -> keyword
+        # and keyword -> category matrices are laid out profile after profile
+        self.surfaces = {}
+        surface_rows, keyword_cols = [], []
+        keyword_rows, category_cols = [], []
+        keyword_counts = []
+        self.columns = {}
+        keyword_offset = 0
+        for profile_id, compiled in self.profiles.items():
+            keywords = {}
+            for category in compiled.categories:
+                for keyword in compiled.matcher.categories[category['key']]:
+                    keywords.setdefault(keyword, keyword_offset + len(keywords))
+
+            for surface, surface_keywords in compiled.matcher.surface_map().items():
+                row = self.surfaces.setdefault(surface, len(self.surfaces))
+                for keyword in surface_keywords:
+                    surface_rows.append(row)
+                    keyword_cols.append(keywords[keyword])
+
+            columns = []
+            for category in compiled.categories:
+                column = len(keyword_counts)
+                category_keywords = compiled.matcher.categories[category['key']]
+                for keyword in category_keywords:
+                    keyword_rows.append(keywords[keyword])
+                    category_cols.append(column)
+                keyword_counts.append(len(category_keywords))
+                columns.append(column)
+
+            self.columns[profile_id] = columns
+            keyword_offset += len(keywords)
+
+        self.matcher = KeywordMatcher({'surfaces': list(self.surfaces)})
+        self.surface_keywords = sparse.csr_matrix(
+            (np.ones(len(surface_rows)), (surface_rows, keyword_cols)),
+            shape=(len(self.surfaces), keyword_offset)
+        )
+        self.keyword_categories = sparse.csr_matrix(
+            (np.ones(len(keyword_rows)), (keyword_rows, category_cols)),
+            shape=(keyword_offset, len(keyword_counts))
+        )
+        self.keyword_counts = np.array(keyword_counts, dtype=float)
+
+    def keyword_matrix(self, texts):
+        """Binary sparse document-keyword matrix over all profiles, one scan per text"""
+        rows, cols = [], []
+        for row, text in enumerate(texts):
+            for surface in self.matcher.find_keywords(text):
+                rows.append(row)
+                cols.append(self.surfaces[surface])
+        surface_hits = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, cols)),
+            shape=(len(texts), len(self.surfaces))
+        )
+        # A keyword found through several spellings still counts once
+        return ((surface_hits @ self.surface_keywords) > 0).astype(float)
+
+    def score(self, texts):
+        """
+        Score resume texts against every profile.
+
+        Returns one dict per text mapping profile ID -> scores, in the
+        same shape ResumeEvaluator.evaluate returns.
+        """
+        if not texts:
+            return []
+
+        # Hits per category, from keywords hit through any of their spellings
+        keyword_hits = self.keyword_matrix(texts)
+        category_hits = (keyword_hits @ self.keyword_categories).toarray()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            category_scores = np.where(
+                self.keyword_counts > 0,
+                np.minimum(category_hits / self.keyword_counts * 100, 100),
+                0
+            )
+
+        years = np.array([ResumeEvaluator.extract_years_of_experience(text) for text in texts])
+
+        results = [{} for _ in texts]
+        for profile_id, compiled in self.profiles.items():
+            columns = self.columns[profile_id]
+            weights = np.array([category['weight'] for category in compiled.categories])
+            profile_scores = category_scores[:, columns]
+            weighted = profile_scores @ weights
+
+            experience = compiled.experience
+            if experience:
+                target = experience['target_years']
+                experience_scores = np.where(years >= target, 100, years / target * 100)
+                weighted = weighted + experience_scores * experience['weight']
+
+            overall = weighted / compiled.total_weight if compiled.total_weight else np.zeros(len(texts))
+
+            for row in range(len(texts)):
+                scores = {
+                    category['key']: round(float(profile_scores[row, index]), 2)
+                    for index, category in enumerate(compiled.categories)
+                }
+                if experience:
+                    scores[experience['key']] = round(float(experience_scores[row]), 2)
+                scores['overall_score'] = round(float(overall[row]), 2)
+                results[row][profile_id] = scores
+
+        return results
@@ -0,0 +1,189 @@
+import hashlib
+import logging
+import zlib
+import numpy as np
+from bson.binary import Binary
+from bson.objectid import ObjectId
+from config import Config
+
+# Mersenne prime for the universal hash family; a * x + b stays below
+# 2**64 for 32-bit a, b and x
+_PRIME = np.uint64((1 << 61) - 1)
+_MASK = np.uint64(0xFFFFFFFF)
+
+logger = logging.getLogger(__name__)
+
+def _permutations(count):
+    """Fixed (a, b) pairs, so signatures are comparable across processes"""
+    rng = np.random.RandomState(1)
+    a = rng.randint(1, 1 << 32, size=count, dtype=np.uint64)
+    b = rng.randint(0, 1 << 32, size=count, dtype=np.uint64)
+    return a[:, None], b[:, None]
+
+class CandidateIndex:
+    """Contact details and MinHash signatures for spotting duplicate candidates
+
+    Every evaluation stores the emails and phone numbers found in its
+    resume under 'contact', and a MinHash signature of its word shingles
+    with the signature's LSH bands under 'minhash'. The bands sit on a
+    multikey (user_id, minhash.bands) index: resumes that share a band
+    are the only candidates compared, so a check reads a handful of
+    documents however many resumes a user has.
+    """
+
+    SHINGLE_SIZE = 3
+
+    _a, _b = _permutations(Config.MINHASH_PERMUTATIONS)
+
+    @staticmethod
+    def contact(document):
+        """Normalized contact details from a TextPreprocessor.analyze document"""
+        phones = []
+        for phone in document['phones']:
+            digits = ''.join(char for char in phone if char.isdigit())
+            # Compare national numbers, with or without a country code
+            phones.append(digits[-10:])
+        return {
+            'emails': sorted({email.lower() for email in document['emails']}),
+            'phones': sorted(set(phones))
+        }
+
+    @staticmethod
+    def signature(terms):
+        """MinHash signature (uint32 array) of a term list, None if it is empty"""
+        size = CandidateIndex.SHINGLE_SIZE
+        shingles = {
+            ' '.join(terms[index:index + size])
+            for index in range(max(len(terms) - size + 1, 1))
+        } if terms else set()
+        if not shingles:
+            return None
+
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode()) for shingle in shingles),
+            dtype=np.uint64, count=len(shingles)
+        )
+        values = (CandidateIndex._a * hashes + CandidateIndex._b) % _PRIME & _MASK
+        return values.min(axis=1).astype(np.uint32)
+
+    @staticmethod
+    def bands(signature):
+        """LSH band keys of a signature; similar resumes likely share one"""
+        rows = len(signature) // Config.MINHASH_BANDS
+        return [
+            f'{band}:' + hashlib.blake2b(
+                signature[band * rows:(band + 1) * rows].tobytes(), digest_size=8
+            ).hexdigest()
+            for band in range(Config.MINHASH_BANDS)
+        ]
+
+    @staticmethod
+    def fields(document, terms):
+        """'contact' and 'minhash' fields to store on an evaluation"""
+        fields = {'contact': CandidateIndex.contact(document)}
+        signature = CandidateIndex.signature(terms)
+        if signature is not None:
+            fields['minhash'] = {
+                'signature': Binary(signature.tobytes()),
+                'bands': CandidateIndex.bands(signature)
+            }
+        return fields
+
+    @staticmethod
+    def similarity(left, right):
+        """Estimated Jaccard similarity of two stored signatures"""
+        left = np.frombuffer(left, dtype=np.uint32)
+        right = np.frombuffer(right, dtype=np.uint32)
+        if len(left) != len(right):
+            return 0.0
+        return float(np.mean(left == right))
+
+    @staticmethod
+    def find_duplicates(db, user_id, documents):
+        """
+        Closest earlier evaluation to each new evaluation, or None.
+
+        documents: evaluation documents about to be inserted, with _id,
+        filename and the fields from fields(). A resume is a duplicate
+        when its estimated similarity reaches DUPLICATE_SIMILARITY, or
+        DUPLICATE_CONTACT_SIMILARITY when it shares an email or phone
+        number with the earlier one. A shared contact with less similar
+        content (a referee, a recruiter's number) is still reported, as
+        match 'contact' with 'duplicate' False.
+        Stored evaluations are fetched with one query, newest first and
+        at most DUPLICATE_MAX_CANDIDATES per document; earlier documents
+        of the same batch count as well. Returns one
+        {'id', 'filename', 'match', 'similarity', 'duplicate'} or None per
+        document.
+        """
+        emails, phones, bands = set(), set(), set()
+        for document in documents:
+            emails.update(document['contact']['emails'])
+            phones.update(document['contact']['phones'])
+            bands.update(document.get('minhash', {}).get('bands', []))
+
+        clauses = []
+        if emails:
+            clauses.append({'contact.emails': {'$in': sorted(emails)}})
+        if phones:
+            clauses.append({'contact.phones': {'$in': sorted(phones)}})
+        if bands:
+            clauses.append({'minhash.bands': {'$in': sorted(bands)}})
+        if not clauses:
+            return [None] * len(documents)
+
+        limit = Config.DUPLICATE_MAX_CANDIDATES * len(documents)
+        candidates = list(db['resume_evaluations'].find(
+            {'user_id': ObjectId(user_id), '$or': clauses},
+            {'filename': 1, 'contact': 1, 'minhash': 1}
+        ).sort('_id', -1).limit(limit))
+        if len(candidates) == limit:
+            logger.warning(
+                'Duplicate check for user %s compared only the newest %d candidates', user_id, limit
+            )
+        # Oldest first, so ties go to the original upload
+        candidates.reverse()
+
+        matches = []
+        for document in documents:
+            matches.append(CandidateIndex._best_match(document, candidates))
+            candidates.append(document)
+        return matches
+
+    @staticmethod
+    def _best_match(document, candidates):
+        contact = document['contact']
+        bands = set(document.get('minhash', {}).get('bands', []))
+        signature = document.get('minhash', {}).get('signature')
+
+        best = None
+        for candidate in candidates:
+            other = candidate.get('contact') or {}
+            shared_contact = (
+                set(contact['emails']).intersection(other.get('emails', [])) or
+                set(contact['phones']).intersection(other.get('phones', []))
+            )
+            other_minhash = candidate.get('minhash') or {}
+            similarity = 0.0
+            if signature and bands.intersection(other_minhash.get('bands', [])):
+                similarity = CandidateIndex.similarity(signature, other_minhash['signature'])
+
+            if similarity >= Config.DUPLICATE_SIMILARITY:
+                match, duplicate = 'content', True
+            elif shared_contact:
+                match, duplicate = 'contact', similarity >= Config.DUPLICATE_CONTACT_SIMILARITY
+            else:
+                continue
+
+            # A duplicate beats a shared contact alone; then the closest,
+            # then a shared contact, then the oldest
+            rank = (duplicate, similarity, bool(shared_contact))
+            if best is None or rank > best[0]:
+                best = (rank, {
+                    'id': str(candidate['_id']),
+                    'filename': candidate['filename'],
+                    'match': match,
+                    'similarity': round(similarity, 4),
+                    'duplicate': duplicate
+                })
+        return best[1] if best else None
@@ -1,5 +1,51 @@
-import re
-from datetime import datetime
+import hashlib
+import json
+import logging
+from functools import lru_cache
+from utils.keyword_matcher import KeywordMatcher
+from utils.experience_parser import total_experience_months
+from utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=128)
+def _matcher_for(keywords):
+    """Compiled matcher for a single keyword list, built once per list"""
+    return KeywordMatcher({'keywords': keywords})
+
+def profile_version(definition):
+    """Content digest of a profile's scoring rules (a stored 'version' is ignored)"""
+    rules = {
+        'categories': definition['categories'],
+        'experience': definition.get('experience')
+    }
+    payload = json.dumps(rules, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+class CompiledProfile:
+    """Job profile compiled into a single keyword matcher"""
+    
+    def __init__(self, definition, version):
+        self.version = version
+        self.categories = definition['categories']
+        self.experience = definition.get('experience')
+        
+        synonyms = {}
+        for category in self.categories:
+            for keyword, alternatives in category.get('synonyms', {}).items():
+                synonyms.setdefault(keyword, []).extend(alternatives)
+        
+        self.matcher = KeywordMatcher(
+            {category['key']: category['keywords'] for category in self.categories},
+            synonyms
+        )
+        
+        self.total_weight = sum(category['weight'] for category in self.categories)
+        if self.experience:
+            self.total_weight += self.experience['weight']
+
+# Compiled profiles by version, so an edited profile recompiles
+_compiled_profiles = LRUCache(64)
 
 class ResumeEvaluator:
     """Intelligent resume evaluation engine"""
@@ -21,70 +67,153 @@ class ResumeEvaluator:
         'python'
     ]
     
+    EXPERIENCE_TARGET_YEARS = 5
+    
+    _default_version = None
+    
+    @classmethod
+    def default_profile(cls):
+        """Built-in profile used when no job profile is selected"""
+        return {
+            'categories': [
+                {'key': 'ai_ml_match', 'keywords': cls.AI_ML_KEYWORDS, 'weight': 0.3},
+                {'key': 'llm_match', 'keywords': cls.LLM_KEYWORDS, 'weight': 0.2},
+                {'key': 'python_match', 'keywords': cls.PYTHON_KEYWORDS, 'weight': 0.3}
+            ],
+            'experience': {
+                'key': 'experience_match',
+                'target_years': cls.EXPERIENCE_TARGET_YEARS,
+                'weight': 0.2
+            }
+        }
+    
+    @classmethod
+    def compile(cls, profile=None):
+        """
+        Compiled form of a profile definition (default profile if None)
+        
+        Stored job profiles carry their 'version' (see JobProfile.definition),
+        so only definitions without one are serialized and hashed.
+        """
+        if profile:
+            definition = profile
+            version = profile.get('version') or profile_version(profile)
+        else:
+            definition = cls.default_profile()
+            if cls._default_version is None:
+                cls._default_version = profile_version(definition)
+            version = cls._default_version
+        
+        compiled = _compiled_profiles.get(version)
+        if compiled is None:
+            compiled = CompiledProfile(definition, version)
+            _compiled_profiles.put(version, compiled)
+        return compiled
+    
+    @classmethod
+    def get_matcher(cls):
+        """Matcher over all default categories, compiled on first use"""
+        return cls.compile().matcher
+    
+    @staticmethod
+    def score_hits(hits, keywords):
+        """Percentage of keywords that were found"""
+        return min((len(hits) / len(keywords)) * 100, 100) if keywords else 0
+    
     @staticmethod
     def calculate_keyword_match(text, keywords):
         """Calculate match score based on keyword presence"""
-        text_lower = text.lower()
-        matches = sum(1 for keyword in keywords if keyword.lower() in text_lower)
-        return min((matches / len(keywords)) * 100, 100) if keywords else 0
+        hits = _matcher_for(tuple(keywords)).find_keywords(text)
+        return ResumeEvaluator.score_hits(hits, keywords)
     
     @staticmethod
     def extract_years_of_experience(text):
-        print("parsed text for experience extraction,text",text)
         """Extract years of experience from resume"""
-
         try:
-            # Regex to capture date ranges like 07/2024 - Present or 05/2022 - 11/2023
-            date_ranges = re.findall(r'(\d{2}/\d{4})\s*-\s*(Present|\d{2}/\d{4})', text, re.IGNORECASE)
-            
-            total_months = 0
-            current_date = datetime.now()
-            
-            for start, end in date_ranges:
-                # Convert start date
-                start_month, start_year = map(int, start.split('/'))
-                start_date = datetime(start_year, start_month, 1)
-                
-                # Convert end date or use current date if 'Present'
-                if end.lower() == "present":
-                    end_date = current_date
-                else:
-                    end_month, end_year = map(int, end.split('/'))
-                    end_date = datetime(end_year, end_month, 1)
-                
-                # Calculate difference in months
-                months = (end_date.year - start_date.year) * 12 + (end_date.month - start_date.month)
-                total_months += months
-            
-            # Convert total months to years
-            total_years = total_months / 12
-            return round(total_years, 2)
+            # Date ranges like 07/2024 - Present or Jan 2020 - Mar 2023,
+            # with overlapping jobs counted once
+            return round(total_experience_months(text) / 12, 2)
         except Exception as e:
-            print(f"Error extracting experience: {e}")
+            logger.warning('Error extracting experience: %s', e)
             return 0
     
     @staticmethod
-    def evaluate(resume_text):
+    def analyze(resume_text, profile=None):
         """
-        Evaluate resume and return scores
+        Raw findings scores are computed from, stored with each evaluation
+        
+        Returns the profile's keywords found (through any spelling) and the
+        years of experience, so scores can be recomputed without the text.
         """
+        compiled = ResumeEvaluator.compile(profile)
+        return {
+            # Single scan for all keyword categories
+            'hits': sorted(compiled.matcher.find_keywords(resume_text)),
+            'experience_years': ResumeEvaluator.extract_years_of_experience(resume_text)
+        }
+    
+    @staticmethod
+    def score(analysis, profile=None):
+        """Scores from the output of analyze"""
+        compiled = ResumeEvaluator.compile(profile)
+        hits = set(analysis['hits'])
+        
         # Calculate individual scores
-        ai_ml_score = ResumeEvaluator.calculate_keyword_match(resume_text, ResumeEvaluator.AI_ML_KEYWORDS)
-        llm_score = ResumeEvaluator.calculate_keyword_match(resume_text, ResumeEvaluator.LLM_KEYWORDS)
-        python_score = ResumeEvaluator.calculate_keyword_match(resume_text, ResumeEvaluator.PYTHON_KEYWORDS)
+        scores = {}
+        weighted = 0
+        for category in compiled.categories:
+            key = category['key']
+            keywords = compiled.matcher.categories[key]
+            score = ResumeEvaluator.score_hits(hits.intersection(keywords), keywords)
+            scores[key] = round(score, 2)
+            weighted += score * category['weight']
         
         # Experience score
-        years = ResumeEvaluator.extract_years_of_experience(resume_text)
-        experience_score = 100 if years >= 5 else (years / 5) * 100
+        experience = compiled.experience
+        if experience:
+            years = analysis['experience_years']
+            target = experience['target_years']
+            experience_score = 100 if years >= target else (years / target) * 100
+            scores[experience['key']] = round(experience_score, 2)
+            weighted += experience_score * experience['weight']
         
         # Overall score (weighted average)
-        overall_score = (ai_ml_score * 0.3 + llm_score * 0.2 + 
-                        python_score * 0.3 + experience_score * 0.2)
+        overall_score = weighted / compiled.total_weight if compiled.total_weight else 0
+        scores['overall_score'] = round(overall_score, 2)
+        
+        return scores
+    
+    @staticmethod
+    def evaluate(resume_text, profile=None):
+        """
+        Evaluate resume and return scores
+        
+        profile: job profile definition (categories, keywords, synonyms,
+        weights, experience target); the built-in profile if None
+        """
+        return ResumeEvaluator.score(ResumeEvaluator.analyze(resume_text, profile), profile)
+    
+    @staticmethod
+    def evaluate_with_analysis(resume_text, profile=None):
+        """Scores together with the analysis they came from"""
+        analysis = ResumeEvaluator.analyze(resume_text, profile)
+        return {'scores': ResumeEvaluator.score(analysis, profile), **analysis}
+    
+    @staticmethod
+    def rescan_keywords(old_profile, new_profile):
+        """
+        Keywords of new_profile whose hits cannot be taken from an analysis
+        made under old_profile: new keywords, or ones whose spellings changed
+        """
+        def spellings(profile):
+            surfaces = {}
+            for surface, keywords in ResumeEvaluator.compile(profile).matcher.surface_map().items():
+                for keyword in keywords:
+                    surfaces.setdefault(keyword, set()).add(surface)
+            return surfaces
         
+        old = spellings(old_profile)
         return {
-            'ai_ml_match': round(ai_ml_score, 2),
-            'llm_match': round(llm_score, 2),
-            'python_match': round(python_score, 2),
-            'experience_match': round(experience_score, 2),
-            'overall_score': round(overall_score, 2)
-        }
\ No newline at end of file
+            keyword for keyword, surfaces in spellings(new_profile).items()
+            if old.get(keyword) != surfaces
+        }
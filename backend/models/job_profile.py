@@ -0,0 +1,179 @@
+import logging
+import re
+from datetime import datetime
+from bson.objectid import ObjectId
+from models.evaluator import profile_version
+
+logger = logging.getLogger(__name__)
+
+class JobProfile:
+    """Job profile (scoring rubric) model for MongoDB"""
+
+    KEY_PATTERN = re.compile(r'^[a-z][a-z0-9_]*$')
+
+    @staticmethod
+    def validate(data):
+        """Return an error message for an invalid profile definition, else None"""
+        if not isinstance(data, dict):
+            return 'Profile must be a JSON object'
+        if not isinstance(data.get('name'), str) or not data['name'].strip():
+            return 'Profile name required'
+
+        categories = data.get('categories')
+        if not isinstance(categories, list) or not categories:
+            return 'At least one category required'
+
+        keys = set()
+        for category in categories:
+            if not isinstance(category, dict):
+                return 'Categories must be objects'
+            key = category.get('key')
+            if not isinstance(key, str) or not JobProfile.KEY_PATTERN.match(key) or key == 'overall_score':
+                return f'Invalid category key: {key}'
+            if key in keys:
+                return f'Duplicate category key: {key}'
+            keys.add(key)
+
+            keywords = category.get('keywords')
+            if not isinstance(keywords, list) or not keywords or not all(isinstance(k, str) and k.strip() for k in keywords):
+                return f'{key}: keywords must be a non-empty list of strings'
+
+            synonyms = category.get('synonyms', {})
+            if not isinstance(synonyms, dict) or not all(
+                isinstance(v, list) and all(isinstance(s, str) and s.strip() for s in v) for v in synonyms.values()
+            ):
+                return f'{key}: synonyms must map keywords to lists of strings'
+
+            if not isinstance(category.get('weight'), (int, float)) or category['weight'] < 0:
+                return f'{key}: weight must be a non-negative number'
+
+        experience = data.get('experience')
+        if experience is not None:
+            if not isinstance(experience, dict):
+                return 'experience must be an object'
+            key = experience.get('key', 'experience_match')
+            if not isinstance(key, str) or not JobProfile.KEY_PATTERN.match(key) or key in keys or key == 'overall_score':
+                return f'Invalid experience key: {key}'
+            target = experience.get('target_years')
+            if not isinstance(target, (int, float)) or target <= 0:
+                return 'experience: target_years must be a positive number'
+            if not isinstance(experience.get('weight'), (int, float)) or experience['weight'] < 0:
+                return 'experience: weight must be a non-negative number'
+
+        return None
+
+    @staticmethod
+    def definition(data):
+        """
+        Scoring rules of a profile, in the form ResumeEvaluator accepts
+
+        A stored profile's version is kept, so compiling it needs no
+        hashing; create and update compute their own.
+        """
+        experience = data.get('experience')
+        definition = {
+            'categories': [
+                {
+                    'key': category['key'],
+                    'keywords': category['keywords'],
+                    'synonyms': category.get('synonyms', {}),
+                    'weight': category['weight']
+                }
+                for category in data['categories']
+            ],
+            'experience': {
+                'key': experience.get('key', 'experience_match'),
+                'target_years': experience['target_years'],
+                'weight': experience['weight']
+            } if experience else None
+        }
+        if data.get('version'):
+            definition['version'] = data['version']
+        return definition
+
+    @staticmethod
+    def create(db, user_id, data):
+        """Create job profile"""
+        definition = JobProfile.definition(data)
+        profile_data = {
+            'user_id': ObjectId(user_id),
+            'name': data['name'],
+            **definition,
+            'version': profile_version(definition),
+            'created_at': datetime.utcnow(),
+            'updated_at': datetime.utcnow()
+        }
+        result = db['job_profiles'].insert_one(profile_data)
+        return str(result.inserted_id)
+
+    @staticmethod
+    def find_all_by_user(db, user_id):
+        """Get all job profiles for a user"""
+        try:
+            return list(db['job_profiles'].find(
+                {'user_id': ObjectId(user_id)}
+            ).sort('created_at', -1))
+        except Exception as e:
+            logger.exception('Error finding job profiles: %s', e)
+            return []
+
+    @staticmethod
+    def find_by_id(db, profile_id, user_id):
+        """Find job profile by ID"""
+        try:
+            return db['job_profiles'].find_one({
+                '_id': ObjectId(profile_id),
+                'user_id': ObjectId(user_id)
+            })
+        except:
+            return None
+
+    @staticmethod
+    def find_many(db, profile_ids):
+        """Find job profiles by ID across users (admin use)"""
+        return list(db['job_profiles'].find({
+            '_id': {'$in': [ObjectId(profile_id) for profile_id in profile_ids]}
+        }))
+
+    @staticmethod
+    def update(db, profile_id, user_id, data):
+        """Replace a job profile's rules; its version changes with them"""
+        definition = JobProfile.definition(data)
+        try:
+            result = db['job_profiles'].update_one(
+                {'_id': ObjectId(profile_id), 'user_id': ObjectId(user_id)},
+                {'$set': {
+                    'name': data['name'],
+                    **definition,
+                    'version': profile_version(definition),
+                    'updated_at': datetime.utcnow()
+                }}
+            )
+            return result.matched_count > 0
+        except:
+            return False
+
+    @staticmethod
+    def delete_by_id(db, profile_id, user_id):
+        """Delete job profile"""
+        try:
+            result = db['job_profiles'].delete_one({
+                '_id': ObjectId(profile_id),
+                'user_id': ObjectId(user_id)
+            })
+            return result.deleted_count > 0
+        except:
+            return False
+
+    @staticmethod
+    def to_dict(profile):
+        """Convert job profile to dictionary"""
+        return {
+            'id': str(profile['_id']),
+            'name': profile['name'],
+            'categories': profile['categories'],
+            'experience': profile.get('experience'),
+            'version': profile['version'],
+            'created_at': profile['created_at'].isoformat(),
+            'updated_at': profile['updated_at'].isoformat()
+        }
@@ -1,35 +1,207 @@
+import base64
+import logging
+import re
 from datetime import datetime
 from bson.objectid import ObjectId
+from pymongo.errors import BulkWriteError
+from models.candidate_index import CandidateIndex
+from models.resume_text import ResumeText
+from models.search_index import SearchIndex
+
+logger = logging.getLogger(__name__)
 
 class ResumeEvaluation:
     """Resume Evaluation model for MongoDB"""
     
+    # Listing never needs TF-IDF vectors (tfidf_next exists while
+    # fit-tfidf runs), keyword hits or duplicate detection fields, nor
+    # resume text still embedded in documents written before texts moved
+    # to resume_texts
+    LIST_PROJECTION = {
+        'resume_text': 0, 'tfidf': 0, 'tfidf_next': 0, 'hits': 0, 'contact': 0, 'minhash': 0
+    }
+    
+    # Fields an export needs; everything else stays on the server
+    EXPORT_PROJECTION = {
+        'filename': 1, 'scores': 1, 'overall_score': 1, 'duplicate_of': 1,
+        'created_at': 1, 'updated_at': 1
+    }
+    
+    SORT_ORDERS = {'newest': -1, 'oldest': 1}
+    
+    # Score fields of the built-in profile; each has a ranking index
+    SCORE_FIELDS = ['ai_ml_match', 'llm_match', 'python_match', 'experience_match']
+    
+    # Job profiles may define their own score categories
+    SCORE_KEY_PATTERN = re.compile(r'^[a-z][a-z0-9_]*$')
+    
     @staticmethod
-    def create(db, user_id, filename, resume_text, scores):
-        """Create resume evaluation record"""
-        evaluation_data = {
+    def score_path(field):
+        """Document path of a rankable score field, or None if invalid"""
+        if field == 'overall_score':
+            return 'overall_score'
+        if field and ResumeEvaluation.SCORE_KEY_PATTERN.match(field):
+            return f'scores.{field}'
+        return None
+    
+    @staticmethod
+    def build(user_id, filename, resume_text, scores, content_hash=None,
+              profile_id=None, profile_version=None, tfidf=None, analysis=None, candidate=None):
+        """
+        Build resume evaluation document; the text itself goes to resume_texts
+        
+        candidate: 'contact' and 'minhash' fields from CandidateIndex.fields
+        """
+        document = {
             'user_id': ObjectId(user_id),
             'filename': filename,
-            'resume_text': resume_text,
+            'content_hash': content_hash,
+            'text_hash': ResumeText.text_hash(resume_text),
             'scores': {
-                'ai_ml_match': scores['ai_ml_match'],
-                'llm_match': scores['llm_match'],
-                'python_match': scores['python_match'],
-                'experience_match': scores['experience_match']
+                key: value for key, value in scores.items() if key != 'overall_score'
             },
             'overall_score': scores['overall_score'],
+            'profile_id': ObjectId(profile_id) if profile_id else None,
+            'profile_version': profile_version,
+            # Keywords found and years of experience, so a rubric change
+            # can be re-scored without the text
+            'hits': analysis['hits'] if analysis else None,
+            'experience_years': analysis['experience_years'] if analysis else None,
             'created_at': datetime.utcnow(),
             'updated_at': datetime.utcnow()
         }
-        result = db['resume_evaluations'].insert_one(evaluation_data)
+        if tfidf:
+            document['tfidf'] = tfidf
+        if candidate:
+            document.update(candidate)
+        return document
+    
+    @staticmethod
+    def create(db, user_id, filename, resume_text, scores, content_hash=None,
+               profile_id=None, profile_version=None, tfidf=None, analysis=None, terms=None,
+               candidate=None):
+        """Create resume evaluation record; terms are its search terms if already known"""
+        evaluation_data = ResumeEvaluation.build(
+            user_id, filename, resume_text, scores, content_hash,
+            profile_id, profile_version, tfidf, analysis, candidate
+        )
+        ResumeText.store(db, resume_text)
+        try:
+            result = db['resume_evaluations'].insert_one(evaluation_data)
+        except Exception:
+            ResumeText.release(db, [evaluation_data['text_hash']])
+            raise
+        ResumeEvaluation.update_search_index(db, user_id, added=[(result.inserted_id, resume_text, terms)])
         return str(result.inserted_id)
     
+    @staticmethod
+    def create_many(db, user_id, records):
+        """
+        Create evaluation records with one unordered bulk insert.
+        
+        records: list of dicts with filename, resume_text, scores and
+        optionally content_hash, profile_id, profile_version, tfidf,
+        analysis ('hits' and 'experience_years'), search terms and
+        candidate (CandidateIndex.fields).
+        Returns (ids, errors): ids in input order with None for documents
+        that failed, and a dict of input index -> error message.
+        Records with candidate fields get 'duplicate_of' set to the
+        earlier evaluation they duplicate (see CandidateIndex), or None,
+        and 'contact_match' to one that only shares contact details.
+        """
+        if not records:
+            return [], {}
+        
+        documents = []
+        for record in records:
+            document = ResumeEvaluation.build(
+                user_id, record['filename'], record['resume_text'],
+                record['scores'], record.get('content_hash'),
+                record.get('profile_id'), record.get('profile_version'),
+                record.get('tfidf'), record.get('analysis'), record.get('candidate')
+            )
+            # Assign IDs client-side so they map back to input order
+            document['_id'] = ObjectId()
+            documents.append(document)
+        
+        checked = [
+            (record, document) for record, document in zip(records, documents)
+            if 'contact' in document
+        ]
+        if checked:
+            # Duplicate detection is advisory; a failure must not lose the upload
+            try:
+                matches = CandidateIndex.find_duplicates(db, user_id, [document for _, document in checked])
+            except Exception as e:
+                logger.exception('Error checking for duplicates: %s', e)
+                matches = [None] * len(checked)
+            for (record, document), match in zip(checked, matches):
+                record['duplicate_of'] = match if match and match['duplicate'] else None
+                if record['duplicate_of']:
+                    document['duplicate_of'] = ObjectId(match['id'])
+                elif match:
+                    record['contact_match'] = match
+        
+        ids = [str(document['_id']) for document in documents]
+        errors = {}
+        ResumeText.store_many(db, [record['resume_text'] for record in records])
+        try:
+            db['resume_evaluations'].insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            for write_error in e.details.get('writeErrors', []):
+                index = write_error['index']
+                ids[index] = None
+                errors[index] = write_error.get('errmsg', 'Write failed')
+        except Exception:
+            ResumeEvaluation._release_unwritten(db, documents)
+            raise
+        
+        if errors:
+            ResumeText.release(db, [documents[index]['text_hash'] for index in errors])
+        
+        ResumeEvaluation.update_search_index(db, user_id, added=[
+            (document['_id'], record['resume_text'], record.get('terms'))
+            for document, record, evaluation_id in zip(documents, records, ids) if evaluation_id
+        ])
+        
+        return ids, errors
+    
+    @staticmethod
+    def _release_unwritten(db, documents):
+        """After a failed insert, drop the text references of documents that were not stored"""
+        try:
+            # Part of the batch may have been written before the failure
+            stored = {
+                document['_id'] for document in db['resume_evaluations'].find(
+                    {'_id': {'$in': [document['_id'] for document in documents]}}, {'_id': 1}
+                )
+            }
+            ResumeText.release(db, [
+                document['text_hash'] for document in documents if document['_id'] not in stored
+            ])
+        except Exception as e:
+            # Leaking a reference is safer than deleting a text still in use
+            logger.exception('Error releasing resume text references: %s', e)
+    
+    @staticmethod
+    def update_search_index(db, user_id, added=None, removed=None, remove_all=False):
+        """Keep the search index in step with evaluation writes"""
+        try:
+            if remove_all:
+                SearchIndex.remove_user(db, user_id)
+            if removed:
+                SearchIndex.remove(db, user_id, removed)
+            if added:
+                SearchIndex.add(db, user_id, added, background=True)
+        except Exception as e:
+            logger.exception('Error updating search index: %s', e)
+    
     @staticmethod
     def find_all_by_user(db, user_id):
         """Get all evaluations for a user"""
         try:
             evaluations = list(db['resume_evaluations'].find(
-                {'user_id': ObjectId(user_id)}
+                {'user_id': ObjectId(user_id)}, ResumeEvaluation.LIST_PROJECTION
             ).sort('created_at', -1))
             
             for eval in evaluations:
@@ -38,9 +210,120 @@ class ResumeEvaluation:
             
             return evaluations
         except Exception as e:
-            print(f"Error finding evaluations: {e}")
+            logger.exception('Error finding evaluations: %s', e)
             return []
     
+    @staticmethod
+    def encode_cursor(evaluation):
+        """Opaque keyset cursor for the position after an evaluation"""
+        key = f"{evaluation['created_at'].isoformat()}|{evaluation['_id']}"
+        return base64.urlsafe_b64encode(key.encode()).decode()
+    
+    @staticmethod
+    def decode_cursor(cursor):
+        """Inverse of encode_cursor; raises ValueError on a malformed cursor"""
+        try:
+            created_at, evaluation_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+            return datetime.fromisoformat(created_at), ObjectId(evaluation_id)
+        except Exception:
+            raise ValueError('Invalid cursor')
+    
+    @staticmethod
+    def find_page_by_user(db, user_id, limit=50, cursor=None, sort='newest', min_score=None):
+        """
+        Get one page of a user's evaluations, without resume text.
+        
+        Pages are keyset-paginated on (created_at, _id), served by the
+        (user_id, created_at, _id) index. Returns (evaluations, next_cursor);
+        next_cursor is None on the last page.
+        """
+        query, order = ResumeEvaluation.page_query(user_id, cursor, sort, min_score)
+        evaluations = list(db['resume_evaluations'].find(
+            query, ResumeEvaluation.LIST_PROJECTION
+        ).sort(order).limit(limit + 1))
+        return ResumeEvaluation.finish_page(evaluations, limit)
+    
+    @staticmethod
+    def page_query(user_id, cursor=None, sort='newest', min_score=None):
+        """(query, sort order) for a page of a user's evaluations"""
+        direction = ResumeEvaluation.SORT_ORDERS[sort]
+        query = {'user_id': ObjectId(user_id)}
+        
+        if min_score is not None:
+            query['overall_score'] = {'$gte': min_score}
+        
+        if cursor:
+            created_at, last_id = ResumeEvaluation.decode_cursor(cursor)
+            op = '$lt' if direction < 0 else '$gt'
+            query['$or'] = [
+                {'created_at': {op: created_at}},
+                {'created_at': created_at, '_id': {op: last_id}}
+            ]
+        
+        return query, [('created_at', direction), ('_id', direction)]
+    
+    @staticmethod
+    def finish_page(evaluations, limit):
+        """Trim a page fetched with limit + 1 documents; returns (evaluations, next_cursor)"""
+        next_cursor = None
+        if len(evaluations) > limit:
+            evaluations = evaluations[:limit]
+            next_cursor = ResumeEvaluation.encode_cursor(evaluations[-1])
+        
+        for eval in evaluations:
+            eval['_id'] = str(eval['_id'])
+            eval['user_id'] = str(eval['user_id'])
+        
+        return evaluations, next_cursor
+    
+    @staticmethod
+    def find_top_by_user(db, user_id, field='overall_score', min_score=None, limit=10):
+        """
+        Cursor over a user's highest-scoring evaluations for a score field.
+        
+        Served as a range scan on the (user_id, <field>) index.
+        """
+        query, path = ResumeEvaluation.top_query(user_id, field, min_score)
+        return db['resume_evaluations'].find(
+            query, ResumeEvaluation.LIST_PROJECTION
+        ).sort(path, -1).limit(limit)
+    
+    @staticmethod
+    def top_query(user_id, field='overall_score', min_score=None):
+        """(query, score path) for a user's evaluations ranked by a score field"""
+        path = ResumeEvaluation.score_path(field)
+        if path is None:
+            raise ValueError(f'Invalid score field: {field}')
+        
+        # Evaluations scored by other profiles may lack the field
+        query = {'user_id': ObjectId(user_id), path: {'$exists': True}}
+        if min_score is not None:
+            query[path] = {'$gte': min_score}
+        return query, path
+    
+    @staticmethod
+    def export_cursor(db, user_id, batch_size=500):
+        """
+        Cursor over all of a user's evaluations for export, newest first.
+        
+        Fetches batch_size documents per round trip, so memory stays flat
+        however many evaluations there are.
+        """
+        return db['resume_evaluations'].find(
+            {'user_id': ObjectId(user_id)}, ResumeEvaluation.EXPORT_PROJECTION
+        ).sort([('created_at', -1), ('_id', -1)]).batch_size(batch_size)
+    
+    @staticmethod
+    def find_by_ids(db, evaluation_ids, user_id, limit=None):
+        """Get a user's evaluations by ID, newest first, without resume text"""
+        cursor = db['resume_evaluations'].find({
+            '_id': {'$in': [ObjectId(id) for id in evaluation_ids]},
+            'user_id': ObjectId(user_id)
+        }, ResumeEvaluation.LIST_PROJECTION).sort([('created_at', -1), ('_id', -1)])
+        if limit:
+            cursor = cursor.limit(limit)
+        return list(cursor)
+    
     @staticmethod
     def find_by_id(db, evaluation_id, user_id):
         """Find evaluation by ID"""
@@ -48,7 +331,7 @@ class ResumeEvaluation:
             evaluation = db['resume_evaluations'].find_one({
                 '_id': ObjectId(evaluation_id),
                 'user_id': ObjectId(user_id)
-            })
+            }, ResumeEvaluation.LIST_PROJECTION)
             
             if evaluation:
                 evaluation['_id'] = str(evaluation['_id'])
@@ -62,11 +345,14 @@ class ResumeEvaluation:
     def delete_by_id(db, evaluation_id, user_id):
         """Delete evaluation"""
         try:
-            result = db['resume_evaluations'].delete_one({
+            deleted = db['resume_evaluations'].find_one_and_delete({
                 '_id': ObjectId(evaluation_id),
                 'user_id': ObjectId(user_id)
-            })
-            return result.deleted_count > 0
+            }, {'text_hash': 1})
+            if deleted:
+                ResumeText.release(db, [deleted.get('text_hash')])
+                ResumeEvaluation.update_search_index(db, user_id, removed=[evaluation_id])
+            return deleted is not None
         except:
             return False
     
@@ -74,11 +360,19 @@ class ResumeEvaluation:
     def delete_batch(db, evaluation_ids, user_id):
         """Delete multiple evaluations"""
         try:
-            object_ids = [ObjectId(id) for id in evaluation_ids]
-            result = db['resume_evaluations'].delete_many({
-                '_id': {'$in': object_ids},
+            query = {
+                '_id': {'$in': [ObjectId(id) for id in evaluation_ids]},
                 'user_id': ObjectId(user_id)
-            })
+            }
+            documents = list(db['resume_evaluations'].find(query, {'text_hash': 1}))
+            result = db['resume_evaluations'].delete_many(
+                {'_id': {'$in': [document['_id'] for document in documents]}}
+            )
+            if result.deleted_count:
+                ResumeText.release(db, [document.get('text_hash') for document in documents])
+                ResumeEvaluation.update_search_index(
+                    db, user_id, removed=[document['_id'] for document in documents]
+                )
             return result.deleted_count
         except:
             return 0
@@ -87,9 +381,15 @@ class ResumeEvaluation:
     def delete_all_by_user(db, user_id):
         """Delete all evaluations for user"""
         try:
+            text_hashes = [
+                document.get('text_hash') for document in
+                db['resume_evaluations'].find({'user_id': ObjectId(user_id)}, {'text_hash': 1})
+            ]
             result = db['resume_evaluations'].delete_many({
                 'user_id': ObjectId(user_id)
             })
+            ResumeText.release(db, text_hashes)
+            ResumeEvaluation.update_search_index(db, user_id, remove_all=True)
             return result.deleted_count
         except:
             return 0
@@ -102,6 +402,7 @@ class ResumeEvaluation:
             'filename': evaluation['filename'],
             'scores': evaluation['scores'],
             'overall_score': evaluation['overall_score'],
+            'duplicate_of': str(evaluation['duplicate_of']) if evaluation.get('duplicate_of') else None,
             'created_at': evaluation['created_at'].isoformat(),
             'updated_at': evaluation['updated_at'].isoformat()
         }
\ No newline at end of file
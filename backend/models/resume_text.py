@@ -0,0 +1,114 @@
+import hashlib
+import zlib
+from collections import Counter
+from datetime import datetime
+from bson.binary import Binary
+from pymongo import UpdateOne
+
+class ResumeText:
+    """Content-addressed resume text, stored compressed in resume_texts
+
+    Evaluations reference their text by SHA-256 ('text_hash'), so each
+    distinct text is stored once and read only by the code that needs it.
+    'refs' counts the documents referencing a text; it is deleted when the
+    count drops to zero.
+    """
+
+    COLLECTION = 'resume_texts'
+
+    @staticmethod
+    def text_hash(text):
+        """SHA-256 of the text"""
+        return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def store_many(db, texts):
+        """Store texts (adding one reference each) and return their hashes"""
+        hashes = [ResumeText.text_hash(text) for text in texts]
+        if not texts:
+            return hashes
+
+        first = {}
+        for text_hash, text in zip(hashes, texts):
+            first.setdefault(text_hash, text)
+
+        now = datetime.utcnow()
+        db[ResumeText.COLLECTION].bulk_write([
+            UpdateOne(
+                {'_id': text_hash},
+                {
+                    '$setOnInsert': {
+                        'data': Binary(zlib.compress((first[text_hash] or '').encode('utf-8'))),
+                        'size': len(first[text_hash] or ''),
+                        'created_at': now
+                    },
+                    '$inc': {'refs': count}
+                },
+                upsert=True
+            )
+            for text_hash, count in Counter(hashes).items()
+        ], ordered=False)
+        return hashes
+
+    @staticmethod
+    def store(db, text):
+        """Store one text and return its hash"""
+        return ResumeText.store_many(db, [text])[0]
+
+    @staticmethod
+    def release(db, hashes):
+        """Drop one reference per hash; unreferenced texts are deleted"""
+        counts = Counter(text_hash for text_hash in hashes if text_hash)
+        if not counts:
+            return
+
+        collection = db[ResumeText.COLLECTION]
+        collection.bulk_write([
+            UpdateOne({'_id': text_hash}, {'$inc': {'refs': -count}})
+            for text_hash, count in counts.items()
+        ], ordered=False)
+        collection.delete_many({'_id': {'$in': list(counts)}, 'refs': {'$lte': 0}})
+
+    @staticmethod
+    def load_many(db, hashes):
+        """Mapping of hash -> text for the hashes that exist"""
+        return {
+            document['_id']: zlib.decompress(document['data']).decode('utf-8')
+            for document in db[ResumeText.COLLECTION].find(
+                {'_id': {'$in': list(set(hashes))}}, {'data': 1}
+            )
+        }
+
+    @staticmethod
+    def load(db, text_hash):
+        """Text for a hash, or None"""
+        return ResumeText.load_many(db, [text_hash]).get(text_hash)
+
+    @staticmethod
+    def attach(db, documents):
+        """
+        Set 'resume_text' on documents that reference their text by hash.
+
+        Documents still embedding 'resume_text' (not yet migrated) are
+        left as they are. One query per call.
+        """
+        pending = [
+            document for document in documents
+            if 'resume_text' not in document and document.get('text_hash')
+        ]
+        texts = ResumeText.load_many(db, [document['text_hash'] for document in pending]) if pending else {}
+        for document in pending:
+            document['resume_text'] = texts.get(document['text_hash'])
+        return documents
+
+    @staticmethod
+    def iter_batches(cursor, db, batch_size=500):
+        """Batches of documents from a cursor, with their text attached"""
+        batch = []
+        for document in cursor:
+            batch.append(document)
+            if len(batch) >= batch_size:
+                yield ResumeText.attach(db, batch)
+                batch = []
+        if batch:
+            yield ResumeText.attach(db, batch)
@@ -0,0 +1,45 @@
+from datetime import datetime
+from models.evaluator import ResumeEvaluator
+
+class RubricVersion:
+    """Snapshots of scoring rubrics by version, in rubric_versions
+
+    Evaluations record the version of the rubric they were scored with.
+    The snapshot tells a later re-score which keywords that analysis
+    covered, so unchanged keywords need no text rescan.
+    """
+
+    COLLECTION = 'rubric_versions'
+
+    # Versions already stored by this process
+    _recorded = set()
+
+    @staticmethod
+    def record(db, profile=None):
+        """Store the snapshot of a profile definition (default if None); returns its version"""
+        definition = profile or ResumeEvaluator.default_profile()
+        version = ResumeEvaluator.compile(definition).version
+        if version not in RubricVersion._recorded:
+            db[RubricVersion.COLLECTION].update_one(
+                {'_id': version},
+                {'$setOnInsert': {
+                    'categories': definition['categories'],
+                    'experience': definition.get('experience'),
+                    'created_at': datetime.utcnow()
+                }},
+                upsert=True
+            )
+            RubricVersion._recorded.add(version)
+        return version
+
+    @staticmethod
+    def find_many(db, versions):
+        """Mapping of version -> profile definition for stored snapshots"""
+        return {
+            document['_id']: {
+                'categories': document['categories'],
+                'experience': document.get('experience'),
+                'version': document['_id']
+            }
+            for document in db[RubricVersion.COLLECTION].find({'_id': {'$in': list(versions)}})
+        }
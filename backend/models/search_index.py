@@ -0,0 +1,257 @@
+import atexit
+import logging
+import os
+import re
+import threading
+from bson.objectid import ObjectId
+from config import Config
+from utils.text_preprocessor import TextPreprocessor
+
+logger = logging.getLogger(__name__)
+
+class PostingWriter:
+    """Buffers postings and inserts them in batches from a background thread
+
+    Uploads only queue their postings, so the insert stays off the
+    request path and postings of many uploads (or job files) share one
+    insert_many. A resume becomes searchable within FLUSH_SECONDS.
+    Postings still buffered when a process dies are lost; manage.py
+    build-search-index restores them.
+    """
+
+    def __init__(self, batch_size, interval):
+        self.batch_size = batch_size
+        self.interval = interval
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pid = None
+
+    def put(self, db, postings):
+        """Queue postings for insertion into db"""
+        with self._lock:
+            # A thread inherited through fork does not run in the child
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._pending = []
+                threading.Thread(target=self._work, name='search-index', daemon=True).start()
+            self._pending.append((db, postings))
+            size = sum(len(batch) for _, batch in self._pending)
+        if size >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self):
+        """Insert everything queued so far; returns once it is written"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+
+            collections = {}
+            for db, postings in pending:
+                collections.setdefault(id(db), (db, []))[1].extend(postings)
+            for db, postings in collections.values():
+                try:
+                    SearchIndex.insert(db, postings, self.batch_size)
+                except Exception as e:
+                    logger.exception('Error writing %d search postings: %s', len(postings), e)
+
+    def _work(self):
+        while True:
+            self._wakeup.wait(timeout=self.interval)
+            self._wakeup.clear()
+            self.flush()
+
+posting_writer = PostingWriter(Config.SEARCH_INDEX_BATCH_SIZE, Config.SEARCH_INDEX_FLUSH_SECONDS)
+atexit.register(posting_writer.flush)
+
+class SearchIndex:
+    """Inverted index over resume text, stored in the resume_postings collection
+
+    One posting per (user, term, evaluation) holds the term's token
+    positions. The (user_id, term, evaluation_id) index keeps every
+    posting list sorted, so a query reads the shortest list and probes
+    the others only for the candidates it still has.
+    """
+
+    COLLECTION = 'resume_postings'
+
+    QUERY_TOKEN = re.compile(r'"([^"]*)"|(\S+)')
+
+    @staticmethod
+    def terms(text):
+        """Normalized index terms of a text, in order"""
+        return SearchIndex.tokens_to_terms(
+            TextPreprocessor.tokenize(TextPreprocessor.clean_text(text or ''))
+        )
+
+    @staticmethod
+    def tokens_to_terms(tokens):
+        """Index terms from TextPreprocessor tokens (e.g. of TextPreprocessor.analyze)"""
+        return [term for term in (token.strip('.-') for token in tokens) if term]
+
+    @staticmethod
+    def postings(user_id, evaluation_id, text, terms=None):
+        """Posting documents for one resume; terms skips re-tokenizing text"""
+        positions = {}
+        for position, term in enumerate(SearchIndex.terms(text) if terms is None else terms):
+            positions.setdefault(term, []).append(position)
+
+        return [
+            {
+                'user_id': ObjectId(user_id),
+                'term': term,
+                'evaluation_id': ObjectId(evaluation_id),
+                'positions': term_positions
+            }
+            for term, term_positions in positions.items()
+        ]
+
+    @staticmethod
+    def insert(db, postings, batch_size=None):
+        """Insert posting documents, batch_size (SEARCH_INDEX_BATCH_SIZE) at a time"""
+        batch_size = batch_size or Config.SEARCH_INDEX_BATCH_SIZE
+        for start in range(0, len(postings), batch_size):
+            db[SearchIndex.COLLECTION].insert_many(postings[start:start + batch_size], ordered=False)
+
+    @staticmethod
+    def add(db, user_id, documents, background=False):
+        """
+        Index resumes.
+
+        documents: list of (evaluation_id, resume_text) tuples, or
+        (evaluation_id, resume_text, terms) when the terms are known
+        background: queue the postings on posting_writer instead of
+        inserting them before returning
+        """
+        postings = []
+        for evaluation_id, text, *terms in documents:
+            postings.extend(SearchIndex.postings(user_id, evaluation_id, text, *terms))
+        if not postings:
+            return
+        if background:
+            posting_writer.put(db, postings)
+        else:
+            SearchIndex.insert(db, postings)
+
+    @staticmethod
+    def remove(db, user_id, evaluation_ids):
+        """Drop a user's resumes from the index"""
+        # Queued postings of these resumes must not land after the delete
+        posting_writer.flush()
+        db[SearchIndex.COLLECTION].delete_many({
+            'evaluation_id': {'$in': [ObjectId(id) for id in evaluation_ids]},
+            'user_id': ObjectId(user_id)
+        })
+
+    @staticmethod
+    def remove_user(db, user_id):
+        """Drop all of a user's resumes from the index"""
+        posting_writer.flush()
+        db[SearchIndex.COLLECTION].delete_many({'user_id': ObjectId(user_id)})
+
+    @staticmethod
+    def parse_query(query):
+        """
+        Parse a search query into (groups, excluded).
+
+        Whitespace-separated clauses are ANDed; 'OR' joins neighbouring
+        clauses into one group; a leading '-' excludes a clause; double
+        quotes make a phrase. Each clause is a list of terms (more than
+        one for a phrase).
+        """
+        groups = []
+        excluded = []
+        join_next = False
+        for match in SearchIndex.QUERY_TOKEN.finditer(query or ''):
+            phrase, word = match.groups()
+            if word == 'OR':
+                join_next = bool(groups)
+                continue
+
+            negate = False
+            if word is not None and word.startswith('-') and len(word) > 1:
+                negate = True
+                word = word[1:]
+
+            clause = SearchIndex.terms(phrase if phrase is not None else word)
+            if not clause:
+                continue
+
+            if negate:
+                excluded.append(clause)
+            elif join_next:
+                groups[-1].append(clause)
+            else:
+                groups.append([clause])
+            join_next = False
+
+        return groups, excluded
+
+    @staticmethod
+    def _match_clause(db, user_id, clause, candidates=None):
+        """Evaluation IDs containing a term or phrase, optionally within candidates"""
+        query = {'user_id': ObjectId(user_id)}
+        if candidates is not None:
+            query['evaluation_id'] = {'$in': list(candidates)}
+
+        if len(clause) == 1:
+            query['term'] = clause[0]
+            return {
+                posting['evaluation_id']
+                for posting in db[SearchIndex.COLLECTION].find(query, {'evaluation_id': 1})
+            }
+
+        # Phrase: every term present, at consecutive positions
+        query['term'] = {'$in': list(set(clause))}
+        positions = {}
+        for posting in db[SearchIndex.COLLECTION].find(query, {'evaluation_id': 1, 'term': 1, 'positions': 1}):
+            positions.setdefault(posting['evaluation_id'], {})[posting['term']] = set(posting['positions'])
+
+        matches = set()
+        for evaluation_id, term_positions in positions.items():
+            if len(term_positions) < len(set(clause)):
+                continue
+            starts = term_positions[clause[0]]
+            if any(all(start + offset in term_positions[term] for offset, term in enumerate(clause))
+                   for start in starts):
+                matches.add(evaluation_id)
+        return matches
+
+    @staticmethod
+    def search(db, user_id, query):
+        """Evaluation IDs matching a query; raises ValueError on an empty query"""
+        groups, excluded = SearchIndex.parse_query(query)
+        if not groups:
+            raise ValueError('Query needs at least one search term')
+
+        collection = db[SearchIndex.COLLECTION]
+        frequency = {}
+
+        def size(group):
+            # Phrases are bounded by their rarest term
+            total = 0
+            for clause in group:
+                for term in clause:
+                    if term not in frequency:
+                        frequency[term] = collection.count_documents(
+                            {'user_id': ObjectId(user_id), 'term': term}
+                        )
+                total += min(frequency[term] for term in clause)
+            return total
+
+        # Start from the most selective group, then only probe its candidates
+        groups.sort(key=size)
+        candidates = None
+        for group in groups:
+            matches = set()
+            for clause in group:
+                matches |= SearchIndex._match_clause(db, user_id, clause, candidates)
+            candidates = matches
+            if not candidates:
+                return []
+
+        for clause in excluded:
+            candidates -= SearchIndex._match_clause(db, user_id, clause, candidates)
+
+        return list(candidates)
@@ -0,0 +1,145 @@
+import math
+import uuid
+from collections import Counter
+from datetime import datetime
+import numpy as np
+from bson.objectid import ObjectId
+from scipy import sparse
+from config import Config
+from models.search_index import SearchIndex
+from utils.lru_cache import LRUCache
+
+class TfidfModel:
+    """TF-IDF vocabulary fitted on the stored resume corpus
+
+    Models live in the tfidf_models collection; the newest one is active.
+    Each evaluation stores its L2-normalized sparse vector under 'tfidf'
+    together with the model version, so vectors are computed once and
+    ranking is a single sparse matrix-vector product.
+    """
+
+    COLLECTION = 'tfidf_models'
+
+    _active = None
+    _matrices = LRUCache(Config.TFIDF_MATRIX_CACHE_SIZE)
+
+    def __init__(self, version, terms, idf):
+        self.version = version
+        self.terms = terms
+        self.idf = np.asarray(idf, dtype=np.float32)
+        self.index = {term: position for position, term in enumerate(terms)}
+
+    @staticmethod
+    def fit(texts, min_df=2, max_terms=50000):
+        """Fit a vocabulary and smoothed IDF weights on an iterable of texts"""
+        document_frequency = Counter()
+        total = 0
+        for text in texts:
+            document_frequency.update(set(SearchIndex.terms(text)))
+            total += 1
+
+        frequent = [
+            (term, count) for term, count in document_frequency.items() if count >= min_df
+        ]
+        frequent.sort(key=lambda item: (-item[1], item[0]))
+        frequent = frequent[:max_terms]
+
+        terms = [term for term, _ in frequent]
+        idf = [math.log((1 + total) / (1 + count)) + 1 for _, count in frequent]
+        return TfidfModel(uuid.uuid4().hex[:16], terms, idf)
+
+    def vectorize(self, text, terms=None):
+        """Sparse L2-normalized vector as (indices, weights) lists"""
+        if terms is None:
+            terms = SearchIndex.terms(text)
+        counts = Counter(self.index[term] for term in terms if term in self.index)
+        if not counts:
+            return [], []
+
+        indices = sorted(counts)
+        weights = np.array(
+            [(1 + math.log(counts[index])) * self.idf[index] for index in indices],
+            dtype=np.float32
+        )
+        weights /= np.linalg.norm(weights)
+        return indices, weights.tolist()
+
+    def stored_vector(self, text, terms=None):
+        """Vector in the form kept on evaluation documents"""
+        indices, weights = self.vectorize(text, terms)
+        return {'version': self.version, 'indices': indices, 'weights': weights}
+
+    def save(self, db):
+        """Persist the model; it becomes the active one"""
+        db[self.COLLECTION].insert_one({
+            '_id': self.version,
+            'terms': self.terms,
+            'idf': self.idf.tolist(),
+            'created_at': datetime.utcnow()
+        })
+
+    @classmethod
+    def active(cls, db):
+        """Newest fitted model, or None; reloaded only when a newer one exists"""
+        latest = db[cls.COLLECTION].find_one({}, {'_id': 1}, sort=[('created_at', -1)])
+        if latest is None:
+            return None
+        if cls._active is None or cls._active.version != latest['_id']:
+            document = db[cls.COLLECTION].find_one({'_id': latest['_id']})
+            cls._active = TfidfModel(document['_id'], document['terms'], document['idf'])
+        return cls._active
+
+    @classmethod
+    def vector_for(cls, db, text, terms=None):
+        """Stored vector of a text under the active model, or None before the first fit"""
+        model = cls.active(db)
+        return model.stored_vector(text, terms) if model else None
+
+    def user_matrix(self, db, user_id):
+        """
+        (evaluation IDs, CSR matrix) of a user's stored vectors.
+
+        Cached per user and model version; the cache entry is rebuilt when
+        the user's evaluation count or newest evaluation changes.
+        """
+        collection = db['resume_evaluations']
+        query = {'user_id': ObjectId(user_id), 'tfidf.version': self.version}
+        newest = collection.find_one(query, {'_id': 1}, sort=[('_id', -1)])
+        freshness = (collection.count_documents(query), newest['_id'] if newest else None)
+
+        key = (str(user_id), self.version)
+        cached = self._matrices.get(key)
+        if cached is not None and cached[0] == freshness:
+            return cached[1], cached[2]
+
+        ids, rows, cols, values = [], [], [], []
+        for document in collection.find(query, {'tfidf': 1}).batch_size(1000):
+            row = len(ids)
+            ids.append(document['_id'])
+            vector = document['tfidf']
+            rows.extend([row] * len(vector['indices']))
+            cols.extend(vector['indices'])
+            values.extend(vector['weights'])
+
+        matrix = sparse.csr_matrix(
+            (np.asarray(values, dtype=np.float32), (rows, cols)),
+            shape=(len(ids), len(self.terms))
+        )
+        self._matrices.put(key, (freshness, ids, matrix))
+        return ids, matrix
+
+    def rank(self, db, user_id, text, limit=10):
+        """Top (evaluation ID, cosine similarity) pairs for a text, best first"""
+        ids, matrix = self.user_matrix(db, user_id)
+        indices, weights = self.vectorize(text)
+        if not ids or not indices:
+            return []
+
+        query = np.zeros(len(self.terms), dtype=np.float32)
+        query[indices] = weights
+        similarities = matrix @ query
+
+        limit = min(limit, len(ids))
+        top = np.argpartition(-similarities, limit - 1)[:limit]
+        top = top[np.argsort(-similarities[top])]
+        return [(ids[row], float(similarities[row])) for row in top if similarities[row] > 0]
@@ -1,9 +1,15 @@
 from datetime import datetime
 from bson.objectid import ObjectId
+from config import Config
+from utils.lru_cache import LRUCache
 
 class User:
     """User model for MongoDB"""
     
+    # Users by ID; entries are dropped on update and expire after the TTL,
+    # which bounds staleness across worker processes
+    cache = LRUCache(Config.USER_CACHE_SIZE, ttl=Config.USER_CACHE_TTL)
+    
     @staticmethod
     def get_current_timestamp():
         """Get current timestamp"""
@@ -32,15 +38,39 @@ class User:
     
     @staticmethod
     def find_by_id(db, user_id):
-        """Find user by ID"""
+        """Find user by ID, served from the user cache when possible"""
+        user = User.cache.get(str(user_id))
+        if user is not None:
+            return dict(user)
+        
         try:
             user = db['users'].find_one({'_id': ObjectId(user_id)})
             if user:
                 user['_id'] = str(user['_id'])
+                User.cache.put(str(user_id), dict(user))
             return user
         except:
             return None
     
+    @staticmethod
+    def update(db, user_id, fields):
+        """Update user fields and drop the cached copy"""
+        try:
+            result = db['users'].update_one(
+                {'_id': ObjectId(user_id)},
+                {'$set': {**fields, 'updated_at': User.get_current_timestamp()}}
+            )
+            return result.matched_count > 0
+        except:
+            return False
+        finally:
+            User.invalidate(user_id)
+    
+    @staticmethod
+    def invalidate(user_id):
+        """Drop a user from the cache after an out-of-band change"""
+        User.cache.pop(str(user_id))
+    
     @staticmethod
     def to_dict(user):
         """Convert user to dictionary"""
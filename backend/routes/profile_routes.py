@@ -0,0 +1,78 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from database import get_db
+from models.job_profile import JobProfile
+
+profile_bp = Blueprint('profile', __name__, url_prefix='/api/profiles')
+
+@profile_bp.route('', methods=['GET'])
+@jwt_required()
+def get_profiles():
+    """Get all job profiles for current user"""
+    user_id = get_jwt_identity()
+    db = get_db()
+
+    profiles = JobProfile.find_all_by_user(db, user_id)
+
+    return jsonify({
+        'profiles': [JobProfile.to_dict(profile) for profile in profiles]
+    }), 200
+
+@profile_bp.route('', methods=['POST'])
+@jwt_required()
+def create_profile():
+    """Create a job profile"""
+    user_id = get_jwt_identity()
+    db = get_db()
+    data = request.get_json()
+
+    error = JobProfile.validate(data)
+    if error:
+        return jsonify({'error': error}), 400
+
+    profile_id = JobProfile.create(db, user_id, data)
+
+    return jsonify(JobProfile.to_dict(JobProfile.find_by_id(db, profile_id, user_id))), 201
+
+@profile_bp.route('/<profile_id>', methods=['GET'])
+@jwt_required()
+def get_profile(profile_id):
+    """Get single job profile"""
+    user_id = get_jwt_identity()
+    db = get_db()
+
+    profile = JobProfile.find_by_id(db, profile_id, user_id)
+
+    if not profile:
+        return jsonify({'error': 'Profile not found'}), 404
+
+    return jsonify(JobProfile.to_dict(profile)), 200
+
+@profile_bp.route('/<profile_id>', methods=['PUT'])
+@jwt_required()
+def update_profile(profile_id):
+    """Update a job profile"""
+    user_id = get_jwt_identity()
+    db = get_db()
+    data = request.get_json()
+
+    error = JobProfile.validate(data)
+    if error:
+        return jsonify({'error': error}), 400
+
+    if not JobProfile.update(db, profile_id, user_id, data):
+        return jsonify({'error': 'Profile not found'}), 404
+
+    return jsonify(JobProfile.to_dict(JobProfile.find_by_id(db, profile_id, user_id))), 200
+
+@profile_bp.route('/<profile_id>', methods=['DELETE'])
+@jwt_required()
+def delete_profile(profile_id):
+    """Delete a job profile"""
+    user_id = get_jwt_identity()
+    db = get_db()
+
+    if not JobProfile.delete_by_id(db, profile_id, user_id):
+        return jsonify({'error': 'Profile not found'}), 404
+
+    return jsonify({'message': 'Profile deleted'}), 200
@@ -1,11 +1,23 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from werkzeug.utils import secure_filename
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from database import get_db
 from models.resume_evaluation import ResumeEvaluation
-from models.evaluator import ResumeEvaluator
-from utils.pdf_extractor import extract_resume_text
+from models.job_profile import JobProfile
+from models.search_index import SearchIndex
+from models.tfidf import TfidfModel
+from models.rubric_version import RubricVersion
+from models.candidate_index import CandidateIndex
+from utils.pipeline import process_resumes
+from utils.job_queue import job_queue
+from utils.cache import result_cache
+from utils.upload_reader import read_upload
+from utils.metrics import STAGE_SECONDS, observe_outcome
+from utils.text_preprocessor import TextPreprocessor
 from config import Config
+import csv
+import io
+import json
 import os
 
 resume_bp = Blueprint('resume', __name__, url_prefix='/api/resumes')
@@ -21,13 +33,54 @@ def upload_resumes():
         return jsonify({'error': 'No files provided'}), 400
     
     files = request.files.getlist('files')
-    results = []
-    errors = []
     
+    # Score against a stored job profile, or the built-in one
+    profile_id = request.args.get('profile_id') or request.form.get('profile_id')
+    profile = None
+    if profile_id:
+        job_profile = JobProfile.find_by_id(db, profile_id, user_id)
+        if not job_profile:
+            return jsonify({'error': 'Profile not found'}), 404
+        profile = JobProfile.definition(job_profile)
+    profile_version = RubricVersion.record(db, profile)
+    
+    if request.args.get('mode') == 'async' or request.form.get('mode') == 'async':
+        response, status = queue_upload(user_id, files, profile_id, profile)
+    else:
+        response, status = screen_uploads(db, user_id, files, profile_id, profile, profile_version)
+    return jsonify(response), status
+
+def screen_uploads(db, user_id, files, profile_id=None, profile=None, profile_version=None):
+    """Score uploaded files and store their evaluations; returns (response, status)"""
     # Create uploads folder if it doesn't exist
     if not os.path.exists(Config.UPLOAD_FOLDER):
         os.makedirs(Config.UPLOAD_FOLDER)
     
+    entries, jobs, job_index = read_uploads(files, profile)
+    
+    # Extract text and evaluate on the process pool
+    try:
+        outcomes = process_resumes(jobs, profile)
+    finally:
+        remove_spooled(jobs)
+    
+    return save_outcomes(
+        db, user_id, entries, job_index, outcomes, profile_id, profile, profile_version
+    )
+
+def read_uploads(files, profile=None):
+    """
+    Read every upload first so extraction can run in parallel.
+    
+    files: objects with 'filename' and a binary 'stream'
+    Files seen before (same bytes) are served from the result cache and
+    repeats within the batch are processed once. Returns (entries, jobs,
+    job_index): one entry per file, the (source, file_ext) pipeline jobs
+    and content hash -> job position.
+    """
+    entries = []
+    jobs = []
+    job_index = {}
     for file in files:
         if file and file.filename:
             try:
@@ -35,60 +88,325 @@ def upload_resumes():
                 file_ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
                 
                 if file_ext not in Config.ALLOWED_EXTENSIONS:
-                    errors.append(f'{filename}: Invalid file type')
-                    continue
-                
-                # Save temporarily
-                file_path = os.path.join(Config.UPLOAD_FOLDER, filename)
-                file.save(file_path)
-                
-                # Extract text
-                resume_text = extract_resume_text(file_path, file_ext)
-                
-                if not resume_text:
-                    errors.append(f'{filename}: Could not extract text')
-                    os.remove(file_path)
+                    entries.append({'error': f'{filename}: Invalid file type'})
                     continue
                 
-                # Evaluate
-                scores = ResumeEvaluator.evaluate(resume_text)
-                
-                # Save to MongoDB
-                evaluation_id = ResumeEvaluation.create(
-                    db, user_id, filename, resume_text, scores
-                )
-                
-                results.append({
-                    'id': evaluation_id,
+                with STAGE_SECONDS.time(stage='save'):
+                    content_hash, source = read_upload(file)
+                entry = {
                     'filename': filename,
-                    'scores': scores
-                })
+                    'original_filename': file.filename,
+                    'content_hash': content_hash
+                }
+                
+                cached = result_cache.lookup(content_hash, profile)
+                if cached is not None:
+                    entry['outcome'] = cached
+                elif content_hash in job_index:
+                    entry['job'] = job_index[content_hash]
+                else:
+                    entry['job'] = job_index[content_hash] = len(jobs)
+                    jobs.append((source, file_ext))
+                    source = None
                 
-                # Clean up
-                os.remove(file_path)
+                # Only large uploads are spooled to disk
+                if isinstance(source, str):
+                    os.remove(source)
                 
+                entries.append(entry)
             except Exception as e:
-                errors.append(f'{file.filename}: {str(e)}')
+                entries.append({'error': f'{file.filename}: {str(e)}'})
+    return entries, jobs, job_index
+
+def remove_spooled(jobs):
+    """Clean up uploads that were spooled to disk"""
+    for source, _ in jobs:
+        if isinstance(source, str) and os.path.exists(source):
+            os.remove(source)
+
+def save_outcomes(db, user_id, entries, job_index, outcomes, profile_id=None,
+                  profile=None, profile_version=None):
+    """Cache pipeline outcomes and store evaluations; returns (response, status)"""
+    results = []
+    errors = []
+    
+    for content_hash, index in job_index.items():
+        result_cache.store(content_hash, outcomes[index], profile)
+    
+    # Collect successful evaluations for a single bulk write
+    tfidf_model = TfidfModel.active(db)
+    records = []
+    for entry in entries:
+        if 'error' in entry:
+            continue
+        
+        outcome = entry['outcome'] if 'outcome' in entry else outcomes[entry['job']]
+        observe_outcome(outcome)
+        if 'error' in outcome:
+            entry['error'] = f'{entry["filename"]}: {outcome["error"]}'
+            continue
+        
+        # Analyze once for the search index, TF-IDF vector and duplicate check
+        document = TextPreprocessor.analyze(outcome['resume_text'])
+        terms = SearchIndex.tokens_to_terms(document['tokens'])
+        
+        entry['record'] = len(records)
+        records.append({
+            'filename': entry['filename'],
+            'resume_text': outcome['resume_text'],
+            'scores': outcome['scores'],
+            'content_hash': entry['content_hash'],
+            'profile_id': profile_id,
+            'profile_version': profile_version,
+            'tfidf': tfidf_model.stored_vector(outcome['resume_text'], terms) if tfidf_model else None,
+            'analysis': outcome,
+            'terms': terms,
+            'candidate': CandidateIndex.fields(document, terms)
+        })
+    
+    # Save to MongoDB
+    try:
+        with STAGE_SECONDS.time(stage='db_write'):
+            evaluation_ids, write_errors = ResumeEvaluation.create_many(db, user_id, records)
+    except Exception as e:
+        evaluation_ids = [None] * len(records)
+        write_errors = {index: str(e) for index in range(len(records))}
+    
+    for entry in entries:
+        if 'error' in entry:
+            errors.append(entry['error'])
+            continue
+        
+        index = entry['record']
+        if index in write_errors:
+            errors.append(f'{entry["original_filename"]}: {write_errors[index]}')
+            continue
+        
+        results.append({
+            'id': evaluation_ids[index],
+            'filename': entry['filename'],
+            'scores': records[index]['scores'],
+            'duplicate_of': records[index].get('duplicate_of'),
+            'contact_match': records[index].get('contact_match')
+        })
     
     response = {'results': results}
     if errors:
         response['errors'] = errors
     
-    return jsonify(response), 200 if results else 400
+    return response, 200 if results else 400
+
+def queue_upload(user_id, files, profile_id=None, profile=None):
+    """Queue uploaded files for background processing; returns (response, status)"""
+    entries = []
+    for file in files:
+        if file and file.filename:
+            filename = secure_filename(file.filename)
+            file_ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
+            
+            if file_ext not in Config.ALLOWED_EXTENSIONS:
+                entries.append({'filename': filename, 'error': f'{filename}: Invalid file type'})
+                continue
+            
+            entries.append({'filename': filename, 'file_ext': file_ext, 'data': file.read()})
+    
+    if not entries:
+        return {'error': 'No files provided'}, 400
+    
+    job_id = job_queue.submit(user_id, entries, profile_id, profile)
+    
+    return {
+        'job_id': job_id,
+        'status_url': f'/api/resumes/jobs/{job_id}'
+    }, 202
+
+@resume_bp.route('/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_job(job_id):
+    """Get progress and results of a queued upload"""
+    user_id = get_jwt_identity()
+    
+    job = job_queue.get(job_id, user_id)
+    
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    return jsonify(job), 200
 
 @resume_bp.route('', methods=['GET'])
 @jwt_required()
 def get_resumes():
-    """Get all resumes for current user"""
+    """Get a page of resumes for current user"""
     user_id = get_jwt_identity()
     db = get_db()
     
-    evaluations = ResumeEvaluation.find_all_by_user(db, user_id)
+    sort = request.args.get('sort', 'newest')
+    if sort not in ResumeEvaluation.SORT_ORDERS:
+        return jsonify({'error': f'Invalid sort: {sort}'}), 400
+    
+    try:
+        limit = min(max(int(request.args.get('limit', Config.PAGE_SIZE)), 1), Config.MAX_PAGE_SIZE)
+        min_score = request.args.get('min_score', type=float)
+        evaluations, next_cursor = ResumeEvaluation.find_page_by_user(
+            db, user_id,
+            limit=limit,
+            cursor=request.args.get('cursor'),
+            sort=sort,
+            min_score=min_score
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     return jsonify({
+        'resumes': [ResumeEvaluation.to_dict(eval) for eval in evaluations],
+        'next_cursor': next_cursor
+    }), 200
+
+@resume_bp.route('/top', methods=['GET'])
+@jwt_required()
+def get_top_resumes():
+    """Stream the top resumes by a score field"""
+    user_id = get_jwt_identity()
+    db = get_db()
+    
+    field = request.args.get('field', 'overall_score')
+    if ResumeEvaluation.score_path(field) is None:
+        return jsonify({'error': f'Invalid score field: {field}'}), 400
+    
+    try:
+        limit = min(max(int(request.args.get('limit', 10)), 1), Config.MAX_PAGE_SIZE)
+        min_score = request.args.get('min_score', type=float)
+    except ValueError:
+        return jsonify({'error': 'Invalid limit'}), 400
+    
+    evaluations = ResumeEvaluation.find_top_by_user(db, user_id, field, min_score, limit)
+    
+    def generate():
+        yield '{"field": %s, "resumes": [' % json.dumps(field)
+        for index, evaluation in enumerate(evaluations):
+            yield (',' if index else '') + json.dumps(ResumeEvaluation.to_dict(evaluation))
+        yield ']}'
+    
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+@resume_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_resumes():
+    """Stream all resumes for current user as NDJSON or CSV"""
+    user_id = get_jwt_identity()
+    db = get_db()
+    
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({'error': f'Invalid format: {export_format}'}), 400
+    
+    # CSV needs its columns up front; profiles other than the built-in
+    # one name their score fields explicitly
+    fields = [field for field in request.args.get('fields', '').split(',') if field]
+    fields = fields or ResumeEvaluation.SCORE_FIELDS
+    invalid = [field for field in fields if ResumeEvaluation.score_path(field) in (None, 'overall_score')]
+    if invalid:
+        return jsonify({'error': f'Invalid score field: {invalid[0]}'}), 400
+    
+    evaluations = ResumeEvaluation.export_cursor(db, user_id, Config.EXPORT_BATCH_SIZE)
+    
+    def rows():
+        try:
+            for evaluation in evaluations:
+                yield ResumeEvaluation.to_dict(evaluation)
+        finally:
+            evaluations.close()
+    
+    def generate_ndjson():
+        for row in rows():
+            yield json.dumps(row) + '\n'
+    
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(['id', 'filename', 'overall_score'] + fields + ['created_at', 'updated_at'])
+        # Send the header at once, then chunks of about 64KB
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        for row in rows():
+            writer.writerow(
+                [row['id'], row['filename'], row['overall_score']] +
+                [row['scores'].get(field, '') for field in fields] +
+                [row['created_at'], row['updated_at']]
+            )
+            if buffer.tell() >= 65536:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    
+    if export_format == 'csv':
+        generate, mimetype = generate_csv, 'text/csv'
+    else:
+        generate, mimetype = generate_ndjson, 'application/x-ndjson'
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=resumes.{export_format}'}
+    )
+
+@resume_bp.route('/search', methods=['GET'])
+@jwt_required()
+def search_resumes():
+    """Search resume text: terms are ANDed, OR joins, -term excludes, "quotes" for phrases"""
+    user_id = get_jwt_identity()
+    db = get_db()
+    
+    try:
+        limit = min(max(int(request.args.get('limit', Config.PAGE_SIZE)), 1), Config.MAX_PAGE_SIZE)
+        evaluation_ids = SearchIndex.search(db, user_id, request.args.get('q', ''))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    evaluations = ResumeEvaluation.find_by_ids(db, evaluation_ids, user_id, limit=limit)
+    
+    return jsonify({
+        'total': len(evaluation_ids),
         'resumes': [ResumeEvaluation.to_dict(eval) for eval in evaluations]
     }), 200
 
+@resume_bp.route('/match', methods=['POST'])
+@jwt_required()
+def match_resumes():
+    """Rank resumes by TF-IDF cosine similarity to a job description"""
+    user_id = get_jwt_identity()
+    db = get_db()
+    
+    data = request.get_json() or {}
+    job_description = data.get('job_description')
+    if not isinstance(job_description, str) or not job_description.strip():
+        return jsonify({'error': 'Job description required'}), 400
+    
+    try:
+        limit = min(max(int(data.get('limit', 10)), 1), Config.MAX_PAGE_SIZE)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid limit'}), 400
+    
+    model = TfidfModel.active(db)
+    if model is None:
+        return jsonify({'error': 'No TF-IDF model fitted yet; run manage.py fit-tfidf'}), 409
+    
+    ranked = model.rank(db, user_id, job_description, limit)
+    evaluations = {
+        evaluation['_id']: evaluation
+        for evaluation in ResumeEvaluation.find_by_ids(db, [id for id, _ in ranked], user_id)
+    }
+    
+    return jsonify({
+        'model_version': model.version,
+        'resumes': [
+            {**ResumeEvaluation.to_dict(evaluations[id]), 'similarity': round(similarity, 4)}
+            for id, similarity in ranked if id in evaluations
+        ]
+    }), 200
+
 @resume_bp.route('/<resume_id>', methods=['GET'])
 @jwt_required()
 def get_resume(resume_id):
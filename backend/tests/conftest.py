@@ -0,0 +1,40 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('MONGO_URI', 'mongodb://localhost:27017')
+os.environ.setdefault('JWT_SECRET_KEY', 'test-jwt-secret-key-of-at-least-32-bytes')
+
+import mongomock
+import pytest
+from tests.mongomock_support import patch_mongomock
+
+@pytest.fixture
+def db():
+    """Empty in-memory database"""
+    patch_mongomock()
+    return mongomock.MongoClient()['resume_screening_test']
+
+@pytest.fixture
+def app(db, monkeypatch, tmp_path):
+    """Flask app on the test database, without background job workers"""
+    import database
+    from app import create_app
+    from utils.job_queue import job_queue
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(job_queue, 'start', lambda: None)
+    monkeypatch.setattr(database.mongo, '_client', db.client)
+    monkeypatch.setattr(database.mongo, '_db', db)
+    monkeypatch.setattr(database.mongo, '_pid', os.getpid())
+    return create_app()
+
+@pytest.fixture
+def auth_headers(app):
+    """Authorization header for a user ID"""
+    from flask_jwt_extended import create_access_token
+
+    def headers(user_id):
+        with app.app_context():
+            return {'Authorization': f'Bearer {create_access_token(identity=str(user_id))}'}
+    return headers
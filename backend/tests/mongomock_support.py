@@ -0,0 +1,14 @@
+"""mongomock shims shared by the tests and the benchmark harness"""
+
+def patch_mongomock():
+    """mongomock's bulk builder predates the 'sort' argument pymongo now passes"""
+    from mongomock.collection import BulkOperationBuilder
+
+    add_update = BulkOperationBuilder.add_update
+    if getattr(add_update, 'accepts_sort', False):
+        return
+
+    def patched(self, *args, sort=None, **kwargs):
+        return add_update(self, *args, **kwargs)
+    patched.accepts_sort = True
+    BulkOperationBuilder.add_update = patched
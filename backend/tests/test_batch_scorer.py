@@ -0,0 +1,57 @@
+from models.batch_scorer import BatchScorer
+from models.evaluator import ResumeEvaluator
+from utils.keyword_matcher import KeywordMatcher
+
+def profile(*categories, experience=None):
+    return {
+        'categories': [
+            {'key': key, 'keywords': keywords, 'weight': 1, 'synonyms': synonyms or {}}
+            for key, keywords, synonyms in categories
+        ],
+        'experience': experience
+    }
+
+OVERLAPPING = {
+    'a': profile(('ml', ['machine learning'], None)),
+    'b': profile(('systems', ['learning systems'], None)),
+    'c': profile(
+        ('ai', ['ai', 'generative ai'], {'ai': ['artificial intelligence']}),
+        ('python', ['python', 'python developer'], None),
+        experience={'key': 'experience_match', 'target_years': 4, 'weight': 1}
+    ),
+    'default': None
+}
+
+TEXTS = [
+    'Built machine learning systems',
+    'Senior Python developer, generative AI and artificial intelligence. Jan 2019 - Mar 2023',
+    'Machine learning engineer; learning systems at scale; python',
+    ''
+]
+
+def test_overlapping_profiles_score_like_evaluate():
+    results = BatchScorer(OVERLAPPING).score(TEXTS)
+    for text, scores in zip(TEXTS, results):
+        for profile_id, definition in OVERLAPPING.items():
+            assert scores[profile_id] == ResumeEvaluator.evaluate(text, definition), (text, profile_id)
+
+def test_one_profile_match_does_not_consume_another():
+    scores = BatchScorer(OVERLAPPING).score(['Built machine learning systems'])[0]
+    assert scores['a']['ml'] == 100
+    assert scores['b']['systems'] == 100
+
+def test_no_texts():
+    assert BatchScorer(OVERLAPPING).score([]) == []
+
+def test_each_text_is_scanned_once(monkeypatch):
+    scans = []
+    find_keywords = KeywordMatcher.find_keywords
+
+    def counted(self, text):
+        scans.append(text)
+        return find_keywords(self, text)
+
+    scorer = BatchScorer(OVERLAPPING)
+    monkeypatch.setattr(KeywordMatcher, 'find_keywords', counted)
+    scorer.keyword_matrix(TEXTS)
+    assert scans == TEXTS
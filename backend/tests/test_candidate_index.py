@@ -0,0 +1,83 @@
+from bson.objectid import ObjectId
+from config import Config
+from models.candidate_index import CandidateIndex
+from models.resume_evaluation import ResumeEvaluation
+from models.search_index import SearchIndex
+from utils.text_preprocessor import TextPreprocessor
+
+USER_ID = str(ObjectId())
+
+BODY = (
+    'Senior backend engineer with eight years building payment platforms in Python and Go. '
+    'Designed event driven services on Kafka, led migration of a monolith to Kubernetes, '
+    'mentored five engineers and owned on call for the ledger team. Earlier built data '
+    'pipelines with Spark and Airflow for a retail analytics startup in Berlin.'
+)
+REVISED = BODY.replace(
+    'Earlier built data pipelines with Spark and Airflow for a retail analytics startup in Berlin.',
+    'Recently completed a cloud architecture certification and spoke at two conferences about '
+    'distributed tracing and observability for financial systems in production.'
+)
+OTHER = (
+    'Registered nurse with ten years of intensive care experience, trained new staff on '
+    'ventilator protocols, coordinated patient transfers and maintained medication records.'
+)
+
+def upload(db, *resumes):
+    """Store (filename, text) resumes in one batch; returns their records"""
+    records = []
+    for filename, text in resumes:
+        document = TextPreprocessor.analyze(text)
+        terms = SearchIndex.tokens_to_terms(document['tokens'])
+        records.append({
+            'filename': filename,
+            'resume_text': text,
+            'scores': {'overall_score': 50.0},
+            'terms': terms,
+            'candidate': CandidateIndex.fields(document, terms)
+        })
+    ids, errors = ResumeEvaluation.create_many(db, USER_ID, records)
+    assert not errors
+    for record, evaluation_id in zip(records, ids):
+        record['id'] = evaluation_id
+    return records
+
+def stored_duplicate_of(db, record):
+    return db['resume_evaluations'].find_one({'_id': ObjectId(record['id'])}).get('duplicate_of')
+
+def test_near_identical_resume_is_duplicate(db):
+    original, = upload(db, ('original.pdf', 'jane@example.com\n' + BODY))
+    copy, = upload(db, ('copy.pdf', 'jane.doe@example.org\n' + BODY))
+
+    assert copy['duplicate_of']['id'] == original['id']
+    assert copy['duplicate_of']['match'] == 'content'
+    assert stored_duplicate_of(db, copy) == ObjectId(original['id'])
+
+def test_revised_resume_with_same_contact_is_duplicate(db):
+    original, revised = upload(
+        db, ('v1.pdf', 'jane@example.com\n' + BODY), ('v2.pdf', 'JANE@example.com\n' + REVISED)
+    )
+
+    match = revised['duplicate_of']
+    assert match['match'] == 'contact' and match['duplicate']
+    assert Config.DUPLICATE_CONTACT_SIMILARITY <= match['similarity'] < Config.DUPLICATE_SIMILARITY
+    assert stored_duplicate_of(db, revised) == ObjectId(original['id'])
+
+def test_shared_contact_alone_is_not_duplicate(db):
+    # e.g. both list the same referee or recruiter
+    upload(db, ('engineer.pdf', BODY + '\nReferences: hr@agency.com, (555) 123-4567'))
+    nurse, = upload(db, ('nurse.pdf', OTHER + '\nReferences: hr@agency.com, 555.123.4567'))
+
+    assert nurse['duplicate_of'] is None
+    assert nurse['contact_match']['match'] == 'contact'
+    assert not nurse['contact_match']['duplicate']
+    assert stored_duplicate_of(db, nurse) is None
+
+def test_candidates_are_newest_first_when_truncated(db, monkeypatch, caplog):
+    upload(db, ('old.pdf', 'jane@example.com\n' + OTHER))
+    latest, = upload(db, ('latest.pdf', 'jane@example.com\n' + BODY))
+    monkeypatch.setattr(Config, 'DUPLICATE_MAX_CANDIDATES', 1)
+
+    again, = upload(db, ('again.pdf', 'jane@example.com\n' + BODY))
+    assert again['duplicate_of']['id'] == latest['id']
+    assert 'compared only the newest 1 candidates' in caplog.text
@@ -0,0 +1,56 @@
+import pytest
+from bson.objectid import ObjectId
+from models import evaluator
+from models.evaluator import ResumeEvaluator, profile_version
+from models.job_profile import JobProfile
+
+USER_ID = str(ObjectId())
+
+DATA = {
+    'name': 'Backend',
+    'categories': [{'key': 'python', 'keywords': ['python', 'flask'], 'weight': 1}],
+    'experience': {'target_years': 3, 'weight': 1}
+}
+
+@pytest.mark.parametrize('data', [None, [], ['name'], 'Backend', 42])
+def test_validate_rejects_non_objects(data):
+    assert JobProfile.validate(data) == 'Profile must be a JSON object'
+
+def test_validate_accepts_profile():
+    assert JobProfile.validate(DATA) is None
+    assert JobProfile.validate({**DATA, 'name': '  '}) == 'Profile name required'
+
+def test_stored_version_replaces_client_version(db):
+    profile_id = JobProfile.create(db, USER_ID, {**DATA, 'version': 'stale'})
+    stored = JobProfile.find_by_id(db, profile_id, USER_ID)
+    assert stored['version'] == profile_version(JobProfile.definition(DATA))
+
+    edited = {**DATA, 'categories': [{'key': 'python', 'keywords': ['python'], 'weight': 1}]}
+    JobProfile.update(db, profile_id, USER_ID, {**edited, 'version': stored['version']})
+    updated = JobProfile.find_by_id(db, profile_id, USER_ID)
+    assert updated['version'] == profile_version(JobProfile.definition(edited))
+    assert updated['version'] != stored['version']
+
+def test_compile_uses_stored_version_without_hashing(db, monkeypatch):
+    profile_id = JobProfile.create(db, USER_ID, DATA)
+    definition = JobProfile.definition(JobProfile.find_by_id(db, profile_id, USER_ID))
+    compiled = ResumeEvaluator.compile(definition)
+    ResumeEvaluator.compile()
+
+    def fail(definition):
+        raise AssertionError('profile hashed again')
+
+    monkeypatch.setattr(evaluator, 'profile_version', fail)
+    assert ResumeEvaluator.compile(definition) is compiled
+    assert ResumeEvaluator.compile(dict(definition)).version == definition['version']
+    ResumeEvaluator.compile()
+
+def test_compile_without_version_matches_stored(db):
+    profile_id = JobProfile.create(db, USER_ID, DATA)
+    stored = JobProfile.definition(JobProfile.find_by_id(db, profile_id, USER_ID))
+    unversioned = JobProfile.definition(DATA)
+
+    assert 'version' not in unversioned
+    assert ResumeEvaluator.compile(unversioned) is ResumeEvaluator.compile(stored)
+    text = 'Python and Flask developer, Jan 2018 - Jan 2022'
+    assert ResumeEvaluator.evaluate(text, stored) == ResumeEvaluator.evaluate(text, unversioned)
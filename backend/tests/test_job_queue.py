@@ -0,0 +1,157 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import pytest
+from bson.objectid import ObjectId
+from config import Config
+from utils import job_queue as job_queue_module
+from utils import pipeline
+from utils.job_queue import JobQueue
+
+USER_ID = str(ObjectId())
+RESUME = b'Jane Doe\nPython developer with 5 years of experience in machine learning and Flask.\n'
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch, db):
+    """Queue without worker threads, storing evaluations in the test database"""
+    queue = JobQueue(
+        str(tmp_path / 'jobs.db'), workers=1, lease_seconds=60, max_attempts=3, retention_seconds=3600
+    )
+    monkeypatch.setattr(queue, 'start', queue.init_schema)
+    monkeypatch.setattr(job_queue_module, 'get_db', lambda: db)
+    monkeypatch.setattr(job_queue_module, 'process_single', pipeline._run_inline)
+    monkeypatch.setattr(job_queue_module.result_cache, 'lookup', lambda *args: None)
+    return queue
+
+def submit(queue, data=RESUME, files=1):
+    return queue.submit(USER_ID, [
+        {'filename': f'resume{index}.txt', 'file_ext': 'txt', 'data': data} for index in range(files)
+    ])
+
+def test_finish_after_lost_claim_is_skipped(queue):
+    job_id = submit(queue)
+    queue.lease_seconds = -1
+    stale = queue._claim()
+    current = queue._claim()
+    assert (stale['attempts'], current['attempts']) == (1, 2)
+
+    assert not queue._finish(stale, error='resume.txt: stale')
+    assert queue._finish(current, result={'id': 'x'})
+    assert not queue._finish(stale, error='resume.txt: stale')
+
+    status = queue.get(job_id, USER_ID)
+    assert status['succeeded'] == 1
+    assert 'error' not in status['files'][0]
+
+def test_process_skips_write_without_lease(queue, db):
+    job_id = submit(queue)
+    queue.lease_seconds = -1
+    stale = queue._claim()
+    queue._process(stale)
+    assert db['resume_evaluations'].count_documents({}) == 0
+
+    queue.lease_seconds = 60
+    current = queue._claim()
+    queue._process(current)
+    assert db['resume_evaluations'].count_documents({}) == 1
+    assert queue.get(job_id, USER_ID)['succeeded'] == 1
+
+def test_process_drops_evaluation_when_claim_lost_during_write(queue, db, monkeypatch):
+    submit(queue)
+    item = queue._claim()
+    create_many = job_queue_module.ResumeEvaluation.create_many
+
+    def create_then_lose_claim(*args, **kwargs):
+        result = create_many(*args, **kwargs)
+        # Another worker re-claims the file while this one is writing
+        queue.lease_seconds = -1
+        with queue._connect() as conn:
+            conn.execute('UPDATE job_files SET lease_until = 0')
+        queue._claim()
+        return result
+
+    monkeypatch.setattr(job_queue_module.ResumeEvaluation, 'create_many', create_then_lose_claim)
+    queue._process(item)
+    assert db['resume_evaluations'].count_documents({}) == 0
+
+def test_claim_fails_files_out_of_attempts_and_moves_on(queue):
+    job_id = submit(queue, files=3)
+    with queue._connect() as conn:
+        conn.execute('UPDATE job_files SET attempts = 3 WHERE position < 2')
+
+    item = queue._claim()
+    assert (item['position'], item['attempts']) == (2, 1)
+    files = queue.get(job_id, USER_ID)['files']
+    assert [file['status'] for file in files] == ['failed', 'failed', 'running']
+    assert files[0]['error'] == 'resume0.txt: Processing failed after 3 attempts'
+
+def test_claim_prunes_jobs_finished_before_retention(queue):
+    finished, recent, unfinished = submit(queue), submit(queue), submit(queue, files=2)
+    for _ in range(3):
+        queue._finish(queue._claim(), result={'id': 'x'})
+    old = time.time() - 2 * queue.retention_seconds
+    with queue._connect() as conn:
+        conn.execute('UPDATE jobs SET created_at = ?', (old,))
+        conn.execute('UPDATE job_files SET finished_at = ? WHERE job_id != ?', (old, recent))
+
+    queue._claim()
+    # Pruned at most once per PRUNE_INTERVAL
+    assert queue.get(finished, USER_ID) is not None
+    queue._pruned_at -= queue.PRUNE_INTERVAL
+    queue._claim()
+    assert queue.get(finished, USER_ID) is None
+    assert queue.get(recent, USER_ID)['status'] == 'completed'
+    assert queue.get(unfinished, USER_ID)['processed'] == 1
+    with queue._connect() as conn:
+        assert conn.execute('SELECT COUNT(*) FROM job_files WHERE job_id = ?', (finished,)).fetchone()[0] == 0
+
+class FlakyPool:
+    """Executor whose submit raises BrokenProcessPool a given number of times"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.shut_down = False
+
+    def submit(self, function, *args):
+        if self.failures:
+            self.failures -= 1
+            raise BrokenProcessPool()
+        return ThreadPoolExecutor(max_workers=1).submit(function, *args)
+
+    def shutdown(self, **kwargs):
+        self.shut_down = True
+
+@pytest.fixture
+def pools(monkeypatch):
+    """Pools handed out by get_executor, in order"""
+    pools = []
+    monkeypatch.setattr(Config, 'PIPELINE_WORKERS', 2)
+
+    def get_executor():
+        if pipeline._executor is None:
+            pipeline._executor = pools[len([pool for pool in pools if pool.shut_down])]
+        return pipeline._executor
+
+    monkeypatch.setattr(pipeline, 'get_executor', get_executor)
+    monkeypatch.setattr(pipeline, '_executor', None)
+    return pools
+
+def test_process_single_retries_once_on_fresh_pool(pools, tmp_path):
+    path = tmp_path / 'resume.txt'
+    path.write_bytes(RESUME)
+    pools.extend([FlakyPool(1), FlakyPool(0)])
+
+    outcome = pipeline.process_single(str(path), 'txt')
+    assert 'error' not in outcome
+    assert pools[0].shut_down and not pools[1].shut_down
+
+def test_process_single_reports_repeated_crash(pools, tmp_path):
+    pools.extend([FlakyPool(1), FlakyPool(1), FlakyPool(0)])
+    assert pipeline.process_single(str(tmp_path / 'resume.txt'), 'txt') == {'error': 'Processing crashed'}
+
+def test_reset_executor_keeps_replacement_pool(monkeypatch):
+    old, current = FlakyPool(0), FlakyPool(0)
+    monkeypatch.setattr(pipeline, '_executor', current)
+    pipeline.reset_executor(old)
+    assert pipeline._executor is current
+    assert old.shut_down and not current.shut_down
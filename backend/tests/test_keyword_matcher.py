@@ -0,0 +1,27 @@
+from utils.keyword_matcher import KeywordMatcher
+
+def test_overlapping_keywords_are_all_found():
+    matcher = KeywordMatcher({'ml': ['machine learning', 'learning systems']})
+    assert matcher.find_keywords('Built machine learning systems') == {'machine learning', 'learning systems'}
+
+def test_overlaps_across_categories():
+    matcher = KeywordMatcher({'ml': ['machine learning'], 'systems': ['learning systems', 'systems design']})
+    assert matcher.match('machine learning systems design') == {
+        'ml': {'machine learning'},
+        'systems': {'learning systems', 'systems design'}
+    }
+
+def test_nested_keywords_are_credited():
+    matcher = KeywordMatcher(
+        {'ai': ['generative ai', 'ai'], 'python': ['python developer', 'python']},
+        {'ai': ['artificial intelligence']}
+    )
+    assert matcher.find_keywords('Senior Python  developer: Generative\nAI, artificial intelligence') == {
+        'generative ai', 'ai', 'python developer', 'python'
+    }
+    assert matcher.find_keywords('generative models') == set()
+
+def test_word_boundaries():
+    matcher = KeywordMatcher({'langs': ['go', 'c++', 'r']})
+    assert matcher.find_keywords('Google, Rust and C++; some go') == {'c++', 'go'}
+    assert matcher.find_keywords('') == set()
@@ -0,0 +1,16 @@
+def test_metrics_disabled_without_token(app):
+    app.config['METRICS_TOKEN'] = ''
+    assert app.test_client().get('/api/metrics').status_code == 404
+
+def test_metrics_require_token(app, auth_headers):
+    app.config['METRICS_TOKEN'] = 'scrape-token'
+    client = app.test_client()
+
+    assert client.get('/api/metrics').status_code == 401
+    assert client.get('/api/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    # A user's access token is not the metrics token
+    assert client.get('/api/metrics', headers=auth_headers('0' * 24)).status_code == 401
+
+    response = client.get('/api/metrics', headers={'Authorization': 'Bearer scrape-token'})
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
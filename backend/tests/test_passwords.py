@@ -0,0 +1,24 @@
+import pytest
+from werkzeug.security import generate_password_hash
+from auth import passwords
+from config import Config
+
+@pytest.mark.parametrize('method', [
+    'scrypt', 'scrypt:16384:8:1', 'pbkdf2', 'pbkdf2:sha512', 'pbkdf2:sha256:1000'
+])
+def test_method_prefix_matches_werkzeug(method):
+    assert passwords.method_prefix(method) == generate_password_hash('secret', method).split('$', 1)[0]
+
+def test_needs_rehash_without_hashing(monkeypatch):
+    def fail(*args):
+        raise AssertionError('hashed a password')
+
+    monkeypatch.setattr(passwords, '_run', fail)
+    monkeypatch.setattr(Config, 'PASSWORD_HASH_METHOD', 'scrypt')
+    assert not passwords.needs_rehash('scrypt:32768:8:1$salt$hash')
+    assert passwords.needs_rehash('scrypt:16384:8:1$salt$hash')
+    assert passwords.needs_rehash('pbkdf2:sha256:260000$salt$hash')
+
+    monkeypatch.setattr(Config, 'PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+    assert not passwords.needs_rehash('pbkdf2:sha256:600000$salt$hash')
+    assert passwords.needs_rehash('scrypt:32768:8:1$salt$hash')
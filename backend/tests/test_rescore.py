@@ -0,0 +1,72 @@
+from argparse import Namespace
+from datetime import datetime
+from bson.objectid import ObjectId
+import manage
+from models.evaluator import ResumeEvaluator
+from models.job_profile import JobProfile
+from models.resume_evaluation import ResumeEvaluation
+from models.rubric_version import RubricVersion
+
+USER_ID = str(ObjectId())
+
+def profile_data(data_keywords, synonyms=None):
+    return {
+        'name': 'Backend',
+        'categories': [
+            {'key': 'backend', 'keywords': ['python', 'flask'], 'synonyms': synonyms or {}, 'weight': 1},
+            {'key': 'data', 'keywords': data_keywords, 'weight': 1}
+        ]
+    }
+
+TEXTS = {
+    'unchanged.pdf': 'Python and Flask services',
+    'sql.pdf': 'Python with SQL reporting',
+    'spark.pdf': 'Flask APIs over Spark jobs'
+}
+
+def setup_profile(db, monkeypatch):
+    """Evaluations scored with a stored profile; returns its ID and their IDs by filename"""
+    monkeypatch.setattr(manage, 'get_db', lambda: db)
+    profile_id = JobProfile.create(db, USER_ID, profile_data(['sql']))
+    definition = JobProfile.definition(JobProfile.find_by_id(db, profile_id, USER_ID))
+    version = RubricVersion.record(db, definition)
+
+    records = []
+    for filename, text in TEXTS.items():
+        outcome = ResumeEvaluator.evaluate_with_analysis(text, definition)
+        records.append({
+            'filename': filename, 'resume_text': text, 'scores': outcome['scores'],
+            'profile_id': profile_id, 'profile_version': version, 'analysis': outcome
+        })
+    ids, _ = ResumeEvaluation.create_many(db, USER_ID, records)
+    db['resume_evaluations'].update_many({}, {'$set': {'updated_at': datetime(2000, 1, 1)}})
+    return profile_id, dict(zip(TEXTS, ids))
+
+def rescore(db, profile_id, data):
+    JobProfile.update(db, profile_id, USER_ID, data)
+    manage.rescore_evaluations(Namespace(profile=profile_id, user=None, batch_size=2))
+    version = JobProfile.find_by_id(db, profile_id, USER_ID)['version']
+    documents = list(db['resume_evaluations'].find())
+    assert all(document['profile_version'] == version for document in documents)
+    return {
+        document['filename']: document for document in documents
+        if document['updated_at'] != datetime(2000, 1, 1)
+    }
+
+def test_only_changed_documents_are_rewritten(db, monkeypatch):
+    profile_id, _ = setup_profile(db, monkeypatch)
+    rewritten = rescore(db, profile_id, profile_data(['sql', 'spark']))
+
+    assert sorted(rewritten) == ['spark.pdf', 'sql.pdf']
+    assert rewritten['spark.pdf']['hits'] == ['flask', 'spark']
+    assert rewritten['sql.pdf']['scores']['data'] == 50
+
+def test_rescanned_documents_with_same_hits_are_not_rewritten(db, monkeypatch):
+    profile_id, _ = setup_profile(db, monkeypatch)
+    # A new spelling forces a rescan, but only sql.pdf uses it
+    rewritten = rescore(db, profile_id, profile_data(['sql'], {'python': ['sql reporting']}))
+    assert rewritten == {}
+
+    rewritten = rescore(db, profile_id, profile_data(['sql'], {'flask': ['sql reporting']}))
+    assert sorted(rewritten) == ['sql.pdf']
+    assert rewritten['sql.pdf']['hits'] == ['flask', 'python', 'sql']
@@ -0,0 +1,31 @@
+import io
+import json
+from bson.objectid import ObjectId
+
+RESUME = b'Jane Doe, jane@example.com\nPython developer: Flask, MongoDB and machine learning, Jan 2019 - Jan 2024.\n'
+
+def upload(client, headers, filename):
+    response = client.post(
+        '/api/resumes/upload', headers=headers,
+        data={'files': (io.BytesIO(RESUME), filename)}, content_type='multipart/form-data'
+    )
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()['results'][0]
+
+def test_export_includes_duplicate_of(app, auth_headers):
+    client = app.test_client()
+    headers = auth_headers(ObjectId())
+    original = upload(client, headers, 'resume.txt')
+    copy = upload(client, headers, 'resume-copy.txt')
+    assert copy['duplicate_of']['id'] == original['id']
+
+    listed = {
+        resume['id']: resume['duplicate_of']
+        for resume in client.get('/api/resumes', headers=headers).get_json()['resumes']
+    }
+    response = client.get('/api/resumes/export', headers=headers)
+    exported = {
+        row['id']: row['duplicate_of']
+        for row in map(json.loads, response.get_data(as_text=True).splitlines())
+    }
+    assert exported == listed == {original['id']: None, copy['id']: original['id']}
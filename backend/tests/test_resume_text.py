@@ -0,0 +1,104 @@
+from argparse import Namespace
+import pytest
+from pymongo.errors import AutoReconnect
+from bson.objectid import ObjectId
+import manage
+from models.resume_evaluation import ResumeEvaluation
+from models.resume_text import ResumeText
+
+USER_ID = str(ObjectId())
+
+TEXT = 'Python developer with Flask and MongoDB experience. ' * 20
+OTHER = 'Data engineer: Spark, Airflow, SQL.'
+
+def texts(db):
+    return {document['_id']: document['refs'] for document in db[ResumeText.COLLECTION].find()}
+
+def upload(db, *resume_texts):
+    records = [
+        {'filename': f'{index}.pdf', 'resume_text': text, 'scores': {'overall_score': 0.0}}
+        for index, text in enumerate(resume_texts)
+    ]
+    ids, errors = ResumeEvaluation.create_many(db, USER_ID, records)
+    assert not errors
+    return ids
+
+def test_store_keeps_one_compressed_copy_per_text(db):
+    hashes = ResumeText.store_many(db, [TEXT, OTHER, TEXT])
+    assert hashes[0] == hashes[2] != hashes[1]
+    assert texts(db) == {hashes[0]: 2, hashes[1]: 1}
+
+    stored = db[ResumeText.COLLECTION].find_one({'_id': hashes[0]})
+    assert len(stored['data']) < len(TEXT)
+    assert ResumeText.load_many(db, hashes) == {hashes[0]: TEXT, hashes[1]: OTHER}
+
+def test_release_deletes_unreferenced_text(db):
+    text_hash, other_hash = ResumeText.store_many(db, [TEXT, OTHER])
+    ResumeText.store(db, TEXT)
+
+    ResumeText.release(db, [text_hash, other_hash, None])
+    assert texts(db) == {text_hash: 1}
+    ResumeText.release(db, [text_hash])
+    assert texts(db) == {}
+
+def test_evaluations_share_text_until_last_delete(db):
+    first, second, other = upload(db, TEXT, TEXT, OTHER)
+    text_hash = ResumeText.text_hash(TEXT)
+    assert texts(db) == {text_hash: 2, ResumeText.text_hash(OTHER): 1}
+    assert 'resume_text' not in db['resume_evaluations'].find_one({'_id': ObjectId(first)})
+
+    assert ResumeEvaluation.delete_by_id(db, first, USER_ID)
+    assert ResumeEvaluation.delete_batch(db, [other], USER_ID) == 1
+    assert texts(db) == {text_hash: 1}
+
+    assert ResumeEvaluation.delete_all_by_user(db, USER_ID) == 1
+    assert texts(db) == {}
+
+def test_attach_loads_referenced_and_keeps_embedded_text(db):
+    stored = {'text_hash': ResumeText.store(db, TEXT)}
+    embedded = {'resume_text': OTHER, 'text_hash': ResumeText.text_hash(OTHER)}
+    missing = {'text_hash': ResumeText.text_hash('gone')}
+
+    ResumeText.attach(db, [stored, embedded, missing])
+    assert stored['resume_text'] == TEXT
+    assert embedded['resume_text'] == OTHER
+    assert missing['resume_text'] is None
+
+def test_migrate_moves_embedded_text(db, monkeypatch):
+    collection = db['resume_evaluations']
+    collection.insert_many([
+        {'user_id': ObjectId(USER_ID), 'resume_text': TEXT},
+        {'user_id': ObjectId(USER_ID), 'resume_text': TEXT},
+        {'user_id': ObjectId(USER_ID), 'resume_text': OTHER}
+    ])
+
+    monkeypatch.setattr(manage, 'get_db', lambda: db)
+    manage.migrate_resume_text(Namespace(batch_size=2))
+    manage.migrate_resume_text(Namespace(batch_size=2))
+
+    assert collection.count_documents({'resume_text': {'$exists': True}}) == 0
+    assert texts(db) == {ResumeText.text_hash(TEXT): 2, ResumeText.text_hash(OTHER): 1}
+    batches = list(ResumeText.iter_batches(collection.find().sort('_id', 1), db, batch_size=2))
+    assert [document['resume_text'] for batch in batches for document in batch] == [TEXT, TEXT, OTHER]
+
+def test_failed_insert_releases_unwritten_texts(db, monkeypatch):
+    collection = type(db['resume_evaluations'])
+    insert_many = collection.insert_many
+
+    def insert_first_then_fail(self, documents, *args, **kwargs):
+        insert_many(self, documents[:1], *args, **kwargs)
+        raise AutoReconnect('connection lost')
+
+    monkeypatch.setattr(collection, 'insert_many', insert_first_then_fail)
+    with pytest.raises(AutoReconnect):
+        upload(db, TEXT, OTHER)
+    assert texts(db) == {ResumeText.text_hash(TEXT): 1}
+
+def test_failed_insert_before_any_write_releases_all_texts(db, monkeypatch):
+    def fail(self, documents, *args, **kwargs):
+        raise AutoReconnect('connection lost')
+
+    monkeypatch.setattr(type(db['resume_evaluations']), 'insert_many', fail)
+    with pytest.raises(AutoReconnect):
+        upload(db, TEXT, OTHER)
+    assert texts(db) == {}
@@ -0,0 +1,92 @@
+from argparse import Namespace
+import pytest
+from bson.objectid import ObjectId
+import manage
+from models import search_index
+from models.resume_evaluation import ResumeEvaluation
+from models.search_index import PostingWriter, SearchIndex
+
+USER_ID = str(ObjectId())
+
+RESUMES = {
+    'platform.pdf': 'Platform engineer: Kubernetes, Terraform and Go. Built a LangChain prototype.',
+    'ml.pdf': 'Machine learning engineer using LangChain and PyTorch; deployed models on Kubernetes.',
+    'data.pdf': 'Data analyst with SQL, dbt and machine-learning coursework.'
+}
+
+@pytest.fixture
+def writer(monkeypatch):
+    """Posting writer that only flushes when asked"""
+    writer = PostingWriter(batch_size=1000, interval=3600)
+    monkeypatch.setattr(search_index, 'posting_writer', writer)
+    return writer
+
+@pytest.fixture
+def inserts(db, monkeypatch):
+    """Sizes of the insert_many calls on the postings collection"""
+    sizes = []
+    collection = type(db[SearchIndex.COLLECTION])
+    insert_many = collection.insert_many
+
+    def counted(self, documents, *args, **kwargs):
+        if self.name == SearchIndex.COLLECTION:
+            sizes.append(len(documents))
+        return insert_many(self, documents, *args, **kwargs)
+
+    monkeypatch.setattr(collection, 'insert_many', counted)
+    return sizes
+
+def upload(db, *filenames):
+    records = [
+        {'filename': filename, 'resume_text': RESUMES[filename], 'scores': {'overall_score': 0.0}}
+        for filename in filenames
+    ]
+    ids, errors = ResumeEvaluation.create_many(db, USER_ID, records)
+    assert not errors
+    return dict(zip(filenames, ids))
+
+def search(db, query, ids):
+    names = {ObjectId(evaluation_id): filename for filename, evaluation_id in ids.items()}
+    return sorted(names[evaluation_id] for evaluation_id in SearchIndex.search(db, USER_ID, query))
+
+def test_uploads_share_one_background_insert(db, writer, inserts):
+    ids = upload(db, 'platform.pdf')
+    ids.update(upload(db, 'ml.pdf', 'data.pdf'))
+    assert inserts == []
+    assert SearchIndex.search(db, USER_ID, 'kubernetes') == []
+
+    writer.flush()
+    assert len(inserts) == 1
+    assert search(db, 'kubernetes langchain', ids) == ['ml.pdf', 'platform.pdf']
+
+def test_queries(db, writer):
+    ids = upload(db, *RESUMES)
+    writer.flush()
+
+    assert search(db, '"machine learning"', ids) == ['ml.pdf']
+    assert search(db, 'terraform OR pytorch', ids) == ['ml.pdf', 'platform.pdf']
+    assert search(db, 'langchain -terraform', ids) == ['ml.pdf']
+    assert search(db, '"learning engineer using"', ids) == ['ml.pdf']
+    assert search(db, '"engineer learning"', ids) == []
+    with pytest.raises(ValueError):
+        SearchIndex.search(db, USER_ID, '-kubernetes')
+
+def test_delete_drops_queued_postings(db, writer):
+    ids = upload(db, 'platform.pdf', 'ml.pdf')
+    assert ResumeEvaluation.delete_by_id(db, ids['ml.pdf'], USER_ID)
+
+    writer.flush()
+    assert search(db, 'langchain', ids) == ['platform.pdf']
+    assert db[SearchIndex.COLLECTION].count_documents({'evaluation_id': ObjectId(ids['ml.pdf'])}) == 0
+
+def test_rebuild_inserts_per_batch(db, writer, inserts, monkeypatch):
+    ids = upload(db, *RESUMES)
+    writer.flush()
+    postings = db[SearchIndex.COLLECTION].count_documents({})
+    inserts.clear()
+
+    monkeypatch.setattr(manage, 'get_db', lambda: db)
+    manage.build_search_index(Namespace(user=None, batch_size=2))
+    assert len(inserts) == 2
+    assert sum(inserts) == postings
+    assert search(db, 'kubernetes', ids) == ['ml.pdf', 'platform.pdf']
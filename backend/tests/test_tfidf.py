@@ -0,0 +1,77 @@
+from argparse import Namespace
+import manage
+from models.resume_evaluation import ResumeEvaluation
+from models.tfidf import TfidfModel
+
+TEXTS = [
+    'python machine learning engineer pytorch',
+    'python backend developer flask mongodb',
+    'react frontend developer typescript',
+    'machine learning researcher python pytorch papers'
+]
+
+SCORES = {'overall_score': 0}
+
+def add_evaluations(db, user_id, texts, model=None):
+    records = [
+        {
+            'filename': f'{index}.txt',
+            'resume_text': text,
+            'scores': SCORES,
+            'tfidf': model.stored_vector(text) if model else None
+        }
+        for index, text in enumerate(texts)
+    ]
+    ids, errors = ResumeEvaluation.create_many(db, user_id, records)
+    assert not errors
+    return ids
+
+def fit(db, monkeypatch):
+    monkeypatch.setattr(manage, 'get_db', lambda: db)
+    manage.fit_tfidf(Namespace(min_df=1, max_terms=1000, batch_size=2))
+    return TfidfModel.active(db)
+
+def test_vectors_are_l2_normalized():
+    model = TfidfModel.fit(TEXTS, min_df=1)
+    indices, weights = model.vectorize('python python pytorch')
+    assert len(indices) == 2
+    assert abs(sum(weight ** 2 for weight in weights) - 1) < 1e-5
+
+def test_rank_orders_by_similarity(db, monkeypatch):
+    user_id = '64b000000000000000000001'
+    add_evaluations(db, user_id, TEXTS)
+    model = fit(db, monkeypatch)
+
+    ranked = model.rank(db, user_id, 'python pytorch machine learning', limit=2)
+    texts = {
+        document['_id']: document['filename']
+        for document in db['resume_evaluations'].find({}, {'filename': 1})
+    }
+    assert [texts[id] for id, _ in ranked] == ['0.txt', '3.txt']
+
+def test_refit_keeps_old_vectors_until_the_new_model_is_active(db, monkeypatch):
+    user_id = '64b000000000000000000001'
+    collection = db['resume_evaluations']
+    add_evaluations(db, user_id, TEXTS[:2])
+    old = fit(db, monkeypatch)
+    add_evaluations(db, user_id, TEXTS[2:], old)
+
+    save = TfidfModel.save
+    seen = {}
+
+    def save_with_upload(model, db):
+        # Until the new model is saved, stored vectors stay on the old one
+        seen['versions'] = {document['tfidf']['version'] for document in collection.find()}
+        # An upload arriving now is vectorized with the still-active model
+        add_evaluations(db, user_id, ['late python upload'], TfidfModel.active(db))
+        save(model, db)
+
+    monkeypatch.setattr(TfidfModel, 'save', save_with_upload)
+    new = fit(db, monkeypatch)
+
+    assert new.version != old.version
+    assert seen['versions'] == {old.version}
+    documents = list(collection.find())
+    assert len(documents) == 5
+    assert {document['tfidf']['version'] for document in documents} == {new.version}
+    assert not any('tfidf_next' in document for document in documents)
@@ -0,0 +1,119 @@
+import hashlib
+import logging
+from datetime import datetime
+from config import Config
+from database import get_db
+from models.evaluator import ResumeEvaluator
+from models.resume_text import ResumeText
+from utils.lru_cache import LRUCache
+from utils.metrics import CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+class ResultCache:
+    """Extracted text and scores keyed by a hash of the uploaded bytes
+
+    Results (scores and the analysis behind them) are kept per job profile
+    version, so cached text can be re-scored against a new profile without
+    extracting it again.
+    Lookups go to an in-process LRU first and, when persistence is
+    enabled, to the resume_cache collection, whose entries reference
+    their text in resume_texts.
+    """
+
+    COLLECTION = 'resume_cache'
+
+    def __init__(self, max_size, persist=False):
+        self.memory = LRUCache(max_size)
+        self.persist = persist
+
+    @staticmethod
+    def content_hash(data):
+        """SHA-256 of the raw upload"""
+        return hashlib.sha256(data).hexdigest()
+
+    def get(self, content_hash):
+        """Cached {'resume_text', 'results': {version: result}} for a hash, or None"""
+        entry = self.memory.get(content_hash)
+        if entry is not None or not self.persist:
+            return entry
+
+        try:
+            db = get_db()
+            document = db[self.COLLECTION].find_one({'_id': content_hash})
+            if document is not None:
+                ResumeText.attach(db, [document])
+        except Exception as e:
+            logger.warning('Error reading result cache: %s', e)
+            return None
+
+        if document is None or document.get('resume_text') is None:
+            return None
+
+        entry = {'resume_text': document['resume_text'], 'results': document.get('results', {})}
+        self.memory.put(content_hash, entry)
+        return entry
+
+    def put(self, content_hash, resume_text, version, result):
+        """Cache extracted text and its result under a profile version"""
+        entry = self.memory.peek(content_hash)
+        if entry is None:
+            entry = {'resume_text': resume_text, 'results': {}}
+        entry['results'][version] = result
+        self.memory.put(content_hash, entry)
+
+        if not self.persist:
+            return
+
+        try:
+            db = get_db()
+            result = db[self.COLLECTION].update_one(
+                {'_id': content_hash},
+                {
+                    '$set': {
+                        f'results.{version}': result,
+                        'updated_at': datetime.utcnow()
+                    },
+                    '$setOnInsert': {'text_hash': ResumeText.text_hash(resume_text)}
+                },
+                upsert=True
+            )
+            # A new entry holds one reference to its text
+            if result.upserted_id is not None:
+                ResumeText.store(db, resume_text)
+        except Exception as e:
+            logger.warning('Error writing result cache: %s', e)
+
+    def lookup(self, content_hash, profile=None):
+        """
+        Pipeline outcome for previously seen bytes, or None on a miss.
+
+        Cached text without a result for this profile is evaluated here,
+        which is far cheaper than extracting it again.
+        """
+        entry = self.get(content_hash)
+        CACHE_LOOKUPS.inc(result='miss' if entry is None else 'hit')
+        if entry is None:
+            return None
+
+        version = ResumeEvaluator.compile(profile).version
+        result = entry['results'].get(version)
+        if result is None:
+            result = ResumeEvaluator.evaluate_with_analysis(entry['resume_text'], profile)
+            self.put(content_hash, entry['resume_text'], version, result)
+
+        return {'resume_text': entry['resume_text'], **result}
+
+    def store(self, content_hash, outcome, profile=None):
+        """Cache a successful pipeline outcome"""
+        if 'error' in outcome:
+            return
+        version = ResumeEvaluator.compile(profile).version
+        self.put(content_hash, outcome['resume_text'], version, {
+            'scores': outcome['scores'],
+            'hits': outcome['hits'],
+            'experience_years': outcome['experience_years']
+        })
+
+# Global result cache shared by the upload route and job workers
+result_cache = ResultCache(Config.RESULT_CACHE_SIZE, persist=Config.RESULT_CACHE_PERSIST)
@@ -0,0 +1,84 @@
+import re
+from datetime import date
+
+MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
+}
+
+_MONTH_NAME = (
+    r'(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|'
+    r'aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?'
+)
+_YEAR = r'(?:19|20)\d{2}'
+_MONTH_NUMBER = r'(?:0?[1-9]|1[0-2])'
+
+def _date(prefix):
+    return (
+        rf'(?:(?P<{prefix}_name>{_MONTH_NAME})\s*,?\s*(?P<{prefix}_name_year>{_YEAR})'
+        rf'|(?P<{prefix}_number>{_MONTH_NUMBER})\s*[/.]\s*(?P<{prefix}_number_year>{_YEAR})'
+        rf'|(?P<{prefix}_year>{_YEAR}))'
+    )
+
+# "Jan 2020 – Mar 2023", "January 2020 to present", "07/2024 - Present",
+# "2019–present", "2016 - 2018"
+DATE_RANGE = re.compile(
+    r'(?<![\w/.-])' + _date('start') +
+    r'\s*(?:-|–|—|to|till|until)\s*' +
+    r'(?:' + _date('end') + r'|(?P<present>present|current|now|today|date))' +
+    r'(?![\w/])',
+    re.IGNORECASE
+)
+
+def _month_index(match, prefix):
+    """Months since year 0 for one side of a range"""
+    if match.group(f'{prefix}_name'):
+        month = MONTHS[match.group(f'{prefix}_name')[:3].lower()]
+        year = match.group(f'{prefix}_name_year')
+    elif match.group(f'{prefix}_number'):
+        month = int(match.group(f'{prefix}_number'))
+        year = match.group(f'{prefix}_number_year')
+    else:
+        # Year-only dates count from January
+        month = 1
+        year = match.group(f'{prefix}_year')
+    return int(year) * 12 + month - 1
+
+def _format(index):
+    return f'{index // 12:04d}-{index % 12 + 1:02d}'
+
+def extract_experience_intervals(text, today=None):
+    """
+    Find employment date ranges and merge overlapping ones.
+
+    Returns intervals sorted by start, as dicts with 'start' and 'end'
+    ('YYYY-MM') and 'months'. Ranges ending in the future or before they
+    start are clipped or dropped.
+    """
+    today = today or date.today()
+    now = today.year * 12 + today.month - 1
+
+    ranges = []
+    for match in DATE_RANGE.finditer(text or ''):
+        start = _month_index(match, 'start')
+        end = now if match.group('present') else _month_index(match, 'end')
+        end = min(end, now)
+        if start < end:
+            ranges.append((start, end))
+
+    ranges.sort()
+    merged = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+
+    return [
+        {'start': _format(start), 'end': _format(end), 'months': end - start}
+        for start, end in merged
+    ]
+
+def total_experience_months(text, today=None):
+    """Months covered by employment ranges, counting overlaps once"""
+    return sum(interval['months'] for interval in extract_experience_intervals(text, today))
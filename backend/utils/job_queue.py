@@ -0,0 +1,353 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from config import Config
+from database import get_db
+from models.resume_evaluation import ResumeEvaluation
+from models.evaluator import ResumeEvaluator
+from models.search_index import SearchIndex
+from models.candidate_index import CandidateIndex
+from models.tfidf import TfidfModel
+from utils.pipeline import process_single
+from utils.cache import result_cache
+from utils.metrics import STAGE_SECONDS, observe_outcome
+from utils.text_preprocessor import TextPreprocessor
+
+logger = logging.getLogger(__name__)
+
+class JobQueue:
+    """SQLite-backed queue for background resume processing
+
+    Uploaded bytes are stored in the queue database, so pending work
+    survives a worker restart. Files are claimed with a lease; a file
+    whose worker died is picked up again once the lease expires. Jobs
+    whose files all finished more than retention_seconds ago are pruned
+    while claiming, at most once per PRUNE_INTERVAL seconds.
+    """
+
+    PRUNE_INTERVAL = 60
+
+    def __init__(self, db_path, workers, lease_seconds, max_attempts, retention_seconds):
+        self.db_path = db_path
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retention_seconds = retention_seconds
+        self._pruned_at = 0
+        self._threads = []
+        self._pid = None
+        self._wakeup = threading.Event()
+        self._start_lock = threading.Lock()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def init_schema(self):
+        """Create queue tables"""
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    user_id TEXT NOT NULL,
+                    profile_id TEXT,
+                    profile TEXT,
+                    created_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS job_files (
+                    job_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    filename TEXT NOT NULL,
+                    file_ext TEXT,
+                    data BLOB,
+                    status TEXT NOT NULL,
+                    lease_until REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    finished_at REAL,
+                    PRIMARY KEY (job_id, position)
+                );
+                CREATE INDEX IF NOT EXISTS idx_job_files_status
+                    ON job_files (status, lease_until);
+            ''')
+            # Queues created before job profiles lack these columns
+            columns = {row['name'] for row in conn.execute('PRAGMA table_info(jobs)')}
+            for column in ('profile_id', 'profile'):
+                if column not in columns:
+                    conn.execute(f'ALTER TABLE jobs ADD COLUMN {column} TEXT')
+            # and before retention, job files lack finished_at
+            columns = {row['name'] for row in conn.execute('PRAGMA table_info(job_files)')}
+            if 'finished_at' not in columns:
+                conn.execute('ALTER TABLE job_files ADD COLUMN finished_at REAL')
+
+    def start(self):
+        """Start worker threads for this process (safe to call repeatedly)"""
+        with self._start_lock:
+            # Threads do not survive fork, so a forked worker starts its own
+            if self._pid == os.getpid():
+                return
+            self.init_schema()
+            self._pid = os.getpid()
+            self._threads = []
+            for index in range(self.workers):
+                thread = threading.Thread(
+                    target=self._work, name=f'resume-job-{index}', daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, user_id, entries, profile_id=None, profile=None):
+        """
+        Queue a job and return its ID.
+
+        entries: list of dicts with 'filename' and either 'error' (file was
+        rejected up front) or 'file_ext' and 'data' (raw upload bytes).
+        profile: job profile definition the files are scored against; it is
+        stored with the job so later edits do not affect queued files.
+        """
+        self.start()
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute(
+                'INSERT INTO jobs (id, user_id, profile_id, profile, created_at) VALUES (?, ?, ?, ?, ?)',
+                (job_id, str(user_id), profile_id, json.dumps(profile) if profile else None, now)
+            )
+            conn.executemany(
+                'INSERT INTO job_files (job_id, position, filename, file_ext, data, status, error, finished_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [
+                    (job_id, position, entry['filename'], entry.get('file_ext'),
+                     entry.get('data'), 'failed' if 'error' in entry else 'pending',
+                     entry.get('error'), now if 'error' in entry else None)
+                    for position, entry in enumerate(entries)
+                ]
+            )
+            conn.execute('COMMIT')
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id, user_id):
+        """Job status with per-file progress, or None if not found"""
+        with self._connect() as conn:
+            job = conn.execute(
+                'SELECT * FROM jobs WHERE id = ? AND user_id = ?', (job_id, str(user_id))
+            ).fetchone()
+            if not job:
+                return None
+            rows = conn.execute(
+                'SELECT position, filename, status, attempts, result, error '
+                'FROM job_files WHERE job_id = ? ORDER BY position', (job_id,)
+            ).fetchall()
+
+        files = []
+        counts = {'pending': 0, 'running': 0, 'done': 0, 'failed': 0}
+        for row in rows:
+            counts[row['status']] += 1
+            item = {'filename': row['filename'], 'status': row['status']}
+            if row['result']:
+                item['result'] = json.loads(row['result'])
+            if row['error']:
+                item['error'] = row['error']
+            files.append(item)
+
+        finished = counts['done'] + counts['failed']
+        if finished == len(files):
+            status = 'completed'
+        elif counts['running'] or finished:
+            status = 'processing'
+        else:
+            status = 'queued'
+
+        return {
+            'id': job['id'],
+            'status': status,
+            'total': len(files),
+            'processed': finished,
+            'succeeded': counts['done'],
+            'failed': counts['failed'],
+            'files': files
+        }
+
+    def _prune(self, conn, now):
+        """Delete jobs whose files all finished before the retention window"""
+        cutoff = now - self.retention_seconds
+        conn.execute(
+            "DELETE FROM jobs WHERE created_at < ? AND id NOT IN ("
+            "SELECT job_id FROM job_files "
+            "WHERE status NOT IN ('done', 'failed') OR finished_at >= ?)",
+            (cutoff, cutoff)
+        )
+        conn.execute('DELETE FROM job_files WHERE job_id NOT IN (SELECT id FROM jobs)')
+        self._pruned_at = now
+
+    def _claim(self):
+        """Lease the next pending (or abandoned) file"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            if self.retention_seconds and now - self._pruned_at >= self.PRUNE_INTERVAL:
+                self._prune(conn, now)
+
+            while True:
+                row = conn.execute(
+                    "SELECT f.job_id, f.position, f.filename, f.file_ext, f.data, f.attempts, "
+                    "j.user_id, j.profile_id, j.profile "
+                    "FROM job_files f JOIN jobs j ON j.id = f.job_id "
+                    "WHERE f.status = 'pending' OR (f.status = 'running' AND f.lease_until < ?) "
+                    "ORDER BY j.created_at, f.position LIMIT 1",
+                    (now,)
+                ).fetchone()
+                if row is None:
+                    conn.execute('COMMIT')
+                    return None
+                if row['attempts'] < self.max_attempts:
+                    break
+
+                # Out of attempts: fail it and look at the next file
+                conn.execute(
+                    "UPDATE job_files SET status = 'failed', data = NULL, error = ?, finished_at = ? "
+                    "WHERE job_id = ? AND position = ?",
+                    (f"{row['filename']}: Processing failed after {row['attempts']} attempts",
+                     now, row['job_id'], row['position'])
+                )
+
+            conn.execute(
+                "UPDATE job_files SET status = 'running', lease_until = ?, attempts = attempts + 1 "
+                "WHERE job_id = ? AND position = ?",
+                (now + self.lease_seconds, row['job_id'], row['position'])
+            )
+            conn.execute('COMMIT')
+            # The attempt number identifies this claim in _holds_claim and _finish
+            item = dict(row)
+            item['attempts'] += 1
+            return item
+
+    def _holds_claim(self, item):
+        """Whether the file is still leased to this attempt"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM job_files WHERE job_id = ? AND position = ? "
+                "AND status = 'running' AND attempts = ? AND lease_until >= ?",
+                (item['job_id'], item['position'], item['attempts'], time.time())
+            ).fetchone()
+        return row is not None
+
+    def _finish(self, item, result=None, error=None):
+        """Record the outcome; False, without writing, if the claim was lost"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                'UPDATE job_files SET status = ?, data = NULL, lease_until = NULL, result = ?, error = ?, '
+                'finished_at = ? '
+                "WHERE job_id = ? AND position = ? AND status = 'running' AND attempts = ?",
+                ('failed' if error else 'done', json.dumps(result) if result else None,
+                 error, time.time(), item['job_id'], item['position'], item['attempts'])
+            )
+        if cursor.rowcount == 0:
+            logger.warning('Lost the lease on job file %s/%s', item['job_id'], item['position'])
+            return False
+        return True
+
+    def _process(self, item):
+        filename = item['filename']
+        profile = json.loads(item['profile']) if item['profile'] else None
+        content_hash = result_cache.content_hash(item['data'])
+        try:
+            outcome = result_cache.lookup(content_hash, profile)
+            if outcome is None:
+                outcome = process_single(item['data'], item['file_ext'], profile)
+                result_cache.store(content_hash, outcome, profile)
+            observe_outcome(outcome)
+
+            if 'error' in outcome:
+                self._finish(item, error=f'{filename}: {outcome["error"]}')
+                return
+
+            # Analyze once for the search index, TF-IDF vector and duplicate check
+            document = TextPreprocessor.analyze(outcome['resume_text'])
+            terms = SearchIndex.tokens_to_terms(document['tokens'])
+
+            # The lease may have expired while processing; another attempt
+            # then owns the file and stores its own evaluation
+            if not self._holds_claim(item):
+                logger.warning('Lost the lease on job file %s/%s', item['job_id'], item['position'])
+                return
+
+            db = get_db()
+            record = {
+                'filename': filename,
+                'resume_text': outcome['resume_text'],
+                'scores': outcome['scores'],
+                'content_hash': content_hash,
+                'profile_id': item['profile_id'],
+                'profile_version': ResumeEvaluator.compile(profile).version,
+                'tfidf': TfidfModel.vector_for(db, outcome['resume_text'], terms),
+                'analysis': outcome,
+                'terms': terms,
+                'candidate': CandidateIndex.fields(document, terms)
+            }
+            with STAGE_SECONDS.time(stage='db_write'):
+                evaluation_ids, write_errors = ResumeEvaluation.create_many(db, item['user_id'], [record])
+            if write_errors:
+                self._finish(item, error=f'{filename}: {write_errors[0]}')
+                return
+
+            finished = self._finish(item, result={
+                'id': evaluation_ids[0],
+                'filename': filename,
+                'scores': outcome['scores'],
+                'duplicate_of': record.get('duplicate_of'),
+                'contact_match': record.get('contact_match')
+            })
+            if not finished:
+                # Lost the claim during the write; the newer attempt's
+                # evaluation is the one the job reports
+                ResumeEvaluation.delete_by_id(db, evaluation_ids[0], item['user_id'])
+        except Exception as e:
+            self._finish(item, error=f'{filename}: {str(e)}')
+
+    def _work(self):
+        while True:
+            try:
+                item = self._claim()
+            except sqlite3.Error as e:
+                logger.warning('Error claiming job: %s', e)
+                item = None
+
+            if item is None:
+                # Poll as well, to pick up work queued by other processes
+                self._wakeup.wait(timeout=1)
+                self._wakeup.clear()
+                continue
+
+            try:
+                self._process(item)
+            except Exception as e:
+                # Lease expiry will hand the file to another attempt
+                logger.exception('Error processing job file %s/%s: %s', item['job_id'], item['position'], e)
+
+# Global job queue, started by init_job_queue
+job_queue = JobQueue(
+    Config.JOB_DB_PATH,
+    workers=Config.JOB_WORKERS,
+    lease_seconds=Config.JOB_LEASE_SECONDS,
+    max_attempts=Config.JOB_MAX_ATTEMPTS,
+    retention_seconds=Config.JOB_RETENTION_SECONDS
+)
+
+def init_job_queue(app):
+    """Start background workers for queued uploads"""
+    job_queue.start()
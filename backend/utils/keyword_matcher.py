@@ -0,0 +1,100 @@
+import re
+
+class KeywordMatcher:
+    """Precompiled multi-keyword matcher
+
+    All keywords of all categories are compiled into a single alternation
+    regex, so the text is scanned once regardless of how many keywords or
+    categories there are. The regex is a lookahead tried at every word
+    start, so matches may overlap ("machine learning" and "learning
+    systems" are both found in "machine learning systems"). Matches are
+    case-insensitive, respect word
+    boundaries and tolerate any run of whitespace between the words of a
+    multi-word keyword. Synonyms are matched as alternative spellings and
+    reported as the keyword they stand for.
+    """
+
+    def __init__(self, categories, synonyms=None):
+        """
+        categories: mapping of category name -> list of keywords
+        synonyms: optional mapping of keyword -> list of alternative spellings
+        """
+        self.categories = {
+            category: list(dict.fromkeys(self.normalize(k) for k in keywords))
+            for category, keywords in categories.items()
+        }
+
+        # keyword -> categories it belongs to
+        self._keyword_categories = {}
+        for category, keywords in self.categories.items():
+            for keyword in keywords:
+                self._keyword_categories.setdefault(keyword, []).append(category)
+
+        # surface form -> keywords it stands for
+        self._aliases = {keyword: {keyword} for keyword in self._keyword_categories}
+        for keyword, alternatives in (synonyms or {}).items():
+            keyword = self.normalize(keyword)
+            if keyword not in self._keyword_categories:
+                continue
+            for alternative in alternatives:
+                self._aliases.setdefault(self.normalize(alternative), set()).add(keyword)
+
+        surfaces = sorted(self._aliases, key=len, reverse=True)
+
+        # Only the longest surface starting at a word is captured, so
+        # remember the shorter ones it contains ("generative ai" contains
+        # "ai") to credit both.
+        single = {surface: self._compile([surface]) for surface in surfaces}
+        self._contained = {
+            surface: [other for other in surfaces
+                      if len(other) < len(surface) and single[other].search(surface)]
+            for surface in surfaces
+        }
+
+        self._pattern = self._compile(surfaces, overlapping=True) if surfaces else None
+
+    def surface_map(self):
+        """Every matched spelling -> the keywords it stands for"""
+        return {surface: set(keywords) for surface, keywords in self._aliases.items()}
+
+    @staticmethod
+    def normalize(keyword):
+        """Lowercase and collapse whitespace"""
+        return ' '.join(keyword.lower().split())
+
+    @staticmethod
+    def _compile(keywords, overlapping=False):
+        alternatives = '|'.join(
+            r'\s+'.join(re.escape(word) for word in keyword.split())
+            for keyword in keywords
+        )
+        if overlapping:
+            # Zero-width, so the scan moves on one character and can match
+            # again inside the previous match; group 1 holds the surface
+            return re.compile(r'(?<![a-z0-9])(?=(' + alternatives + r')(?![a-z0-9]))', re.IGNORECASE)
+        return re.compile(r'(?<![a-z0-9])(?:' + alternatives + r')(?![a-z0-9])', re.IGNORECASE)
+
+    def find_keywords(self, text):
+        """Return the set of keywords present in text"""
+        found = set()
+        if not text or self._pattern is None:
+            return found
+
+        surfaces = set()
+        for match in self._pattern.finditer(text):
+            surface = self.normalize(match.group(1))
+            if surface not in surfaces:
+                surfaces.add(surface)
+                surfaces.update(self._contained[surface])
+
+        for surface in surfaces:
+            found.update(self._aliases[surface])
+        return found
+
+    def match(self, text):
+        """Scan text once and return category -> set of matched keywords"""
+        hits = {category: set() for category in self.categories}
+        for keyword in self.find_keywords(text):
+            for category in self._keyword_categories[keyword]:
+                hits[category].add(keyword)
+        return hits
@@ -0,0 +1,171 @@
+"""Process-local metrics in Prometheus text format
+
+Counters and histograms are kept per process; with several server
+workers each one reports its own values, as with any Prometheus client
+without a shared store.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from pymongo import monitoring
+
+# Seconds; covers sub-millisecond Mongo commands up to slow extractions
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in zip(names, values)
+    )
+    return '{' + pairs + '}'
+
+class Metric:
+    """Base for labelled metrics; values are keyed by label values"""
+
+    kind = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labels):
+            raise ValueError(f'{self.name} expects labels {self.labels}, got {tuple(labels)}')
+        return tuple(labels[name] for name in self.labels)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_value(key, value))
+        return lines
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _render_value(self, key, value):
+        return [f'{self.name}_total{_format_labels(self.labels, key)} {value}']
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0}
+            state['counts'][bisect.bisect_left(self.buckets, value)] += 1
+            state['sum'] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of a with-block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _render_value(self, key, state):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), state['counts']):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else repr(float(bound))
+            labels = _format_labels(self.labels + ('le',), key + (le,))
+            lines.append(f'{self.name}_bucket{labels} {cumulative}')
+        labels = _format_labels(self.labels, key)
+        lines.append(f'{self.name}_sum{labels} {state["sum"]}')
+        lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """All metrics in Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+registry = Registry()
+
+STAGE_SECONDS = registry.register(Histogram(
+    'resume_stage_seconds', 'Time spent per resume in each processing stage', labels=('stage',)
+))
+FILES_PROCESSED = registry.register(Counter(
+    'resume_files_processed', 'Uploaded resumes processed, by outcome', labels=('outcome',)
+))
+EXTRACTION_FAILURES = registry.register(Counter(
+    'resume_extraction_failures', 'Resumes whose text could not be extracted or scored'
+))
+CACHE_LOOKUPS = registry.register(Counter(
+    'resume_cache_lookups', 'Result cache lookups by content hash', labels=('result',)
+))
+MONGO_COMMAND_SECONDS = registry.register(Histogram(
+    'mongo_command_seconds', 'MongoDB command latency', labels=('command', 'outcome')
+))
+KDF_SECONDS = registry.register(Histogram(
+    'auth_kdf_seconds', 'Time spent hashing or checking one password'
+))
+KDF_REJECTED = registry.register(Counter(
+    'auth_kdf_rejected', 'Password hashes turned away because the KDF pool was full'
+))
+
+def observe_outcome(outcome):
+    """
+    Record the result of one pipeline outcome, and its stage timings
+
+    Timings are popped, so an outcome shared by duplicate uploads is
+    only timed once.
+    """
+    for stage, seconds in outcome.pop('timings', {}).items():
+        STAGE_SECONDS.observe(seconds, stage=stage)
+    if 'error' in outcome:
+        EXTRACTION_FAILURES.inc()
+        FILES_PROCESSED.inc(outcome='error')
+    else:
+        FILES_PROCESSED.inc(outcome='success')
+
+class CommandMetrics(monitoring.CommandListener):
+    """pymongo listener timing every command by name"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_COMMAND_SECONDS.observe(
+            event.duration_micros / 1e6, command=event.command_name, outcome='success'
+        )
+
+    def failed(self, event):
+        MONGO_COMMAND_SECONDS.observe(
+            event.duration_micros / 1e6, command=event.command_name, outcome='failure'
+        )
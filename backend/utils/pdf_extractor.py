@@ -1,44 +1,76 @@
+import io
+import logging
 import PyPDF2
 from docx import Document
 
-def extract_text_from_pdf(file_path):
-    """Extract text from PDF"""
+logger = logging.getLogger(__name__)
+
+def _as_source(source):
+    """Wrap raw bytes in a stream; paths and file-like objects pass through"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return source
+
+def iter_pdf_pages(source, max_pages=None):
+    """Yield the text of each PDF page, parsing pages lazily"""
+    pdf_reader = PyPDF2.PdfReader(_as_source(source))
+    for index, page in enumerate(pdf_reader.pages):
+        if max_pages and index >= max_pages:
+            break
+        yield page.extract_text() or ''
+
+def _join_limited(parts, max_chars=None):
+    """Join text parts once, consuming only as many as max_chars needs"""
+    if not max_chars:
+        return '\n'.join(parts)
+
+    collected = []
+    total = 0
+    for part in parts:
+        collected.append(part)
+        total += len(part) + 1
+        if total >= max_chars:
+            break
+    return '\n'.join(collected)[:max_chars]
+
+def extract_text_from_pdf(source, max_pages=None, max_chars=None):
+    """Extract text from PDF (path, bytes or binary file-like object)"""
     try:
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ''
-            for page in pdf_reader.pages:
-                text += page.extract_text()
-        return text
+        return _join_limited(iter_pdf_pages(source, max_pages), max_chars)
     except Exception as e:
-        print(f"Error reading PDF: {e}")
+        logger.warning('Error reading PDF: %s', e)
         return ""
 
-def extract_text_from_docx(file_path):
-    """Extract text from DOCX"""
+def extract_text_from_docx(source, max_chars=None):
+    """Extract text from DOCX (path, bytes or binary file-like object)"""
     try:
-        doc = Document(file_path)
-        text = '\n'.join([para.text for para in doc.paragraphs])
-        return text
+        doc = Document(_as_source(source))
+        return _join_limited((para.text for para in doc.paragraphs), max_chars)
     except Exception as e:
-        print(f"Error reading DOCX: {e}")
+        logger.warning('Error reading DOCX: %s', e)
         return ""
 
-def extract_text_from_txt(file_path):
-    """Extract text from TXT"""
+def extract_text_from_txt(source, max_chars=None):
+    """Extract text from TXT (path, bytes or binary file-like object)"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return file.read()
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            text = bytes(source).decode('utf-8')
+        elif hasattr(source, 'read'):
+            text = source.read().decode('utf-8')
+        else:
+            with open(source, 'r', encoding='utf-8') as file:
+                return file.read(max_chars or -1)
+        return text[:max_chars] if max_chars else text
     except Exception as e:
-        print(f"Error reading TXT: {e}")
+        logger.warning('Error reading TXT: %s', e)
         return ""
 
-def extract_resume_text(file_path, file_type):
-    """Extract resume text based on file type"""
+def extract_resume_text(source, file_type, max_pages=None, max_chars=None):
+    """Extract resume text based on file type, optionally capped by pages/characters"""
     if file_type == 'pdf':
-        return extract_text_from_pdf(file_path)
+        return extract_text_from_pdf(source, max_pages, max_chars)
     elif file_type == 'docx':
-        return extract_text_from_docx(file_path)
+        return extract_text_from_docx(source, max_chars)
     elif file_type == 'txt':
-        return extract_text_from_txt(file_path)
+        return extract_text_from_txt(source, max_chars)
     return ""
\ No newline at end of file
@@ -0,0 +1,125 @@
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from config import Config
+from models.evaluator import ResumeEvaluator
+from utils.pdf_extractor import extract_resume_text
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+def process_resume(source, file_ext, profile=None):
+    """
+    Extract and evaluate a single resume (runs in a worker process)
+
+    Stage durations are returned under 'timings' for the parent process
+    to record, since metrics recorded in a pool worker would be lost.
+    """
+    started = time.perf_counter()
+    resume_text = extract_resume_text(
+        source, file_ext,
+        max_pages=Config.EXTRACT_MAX_PAGES,
+        max_chars=Config.EXTRACT_MAX_CHARS
+    )
+    extracted = time.perf_counter()
+    if not resume_text:
+        return {'error': 'Could not extract text', 'timings': {'extract': extracted - started}}
+
+    result = ResumeEvaluator.evaluate_with_analysis(resume_text, profile)
+    return {
+        'resume_text': resume_text,
+        **result,
+        'timings': {'extract': extracted - started, 'evaluate': time.perf_counter() - extracted}
+    }
+
+def get_executor():
+    """Process pool shared by all requests of this worker, created on first use"""
+    global _executor, _executor_pid
+
+    with _executor_lock:
+        # A pool inherited through fork belongs to the parent process
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ProcessPoolExecutor(max_workers=Config.PIPELINE_WORKERS)
+            _executor_pid = os.getpid()
+        return _executor
+
+def reset_executor(broken):
+    """
+    Drop a broken pool so the next call starts a fresh one
+
+    Only the given pool is dropped: a caller that saw an older pool break
+    must not shut down the replacement another request already started.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+def _run_inline(source, file_ext, profile=None):
+    try:
+        return process_resume(source, file_ext, profile)
+    except Exception as e:
+        return {'error': str(e)}
+
+def process_single(source, file_ext, profile=None):
+    """Process one file on the pool, isolating any worker crash to it"""
+    if Config.PIPELINE_WORKERS <= 1:
+        return _run_inline(source, file_ext, profile)
+
+    # A pool broken by another file gets one retry on a fresh pool; a
+    # second crash is blamed on this file
+    for attempt in range(2):
+        executor = get_executor()
+        try:
+            return executor.submit(process_resume, source, file_ext, profile).result()
+        except BrokenProcessPool:
+            reset_executor(executor)
+        except Exception as e:
+            return {'error': str(e)}
+    return {'error': 'Processing crashed'}
+
+def process_resumes(jobs, profile=None):
+    """
+    Extract and evaluate resumes on the process pool.
+
+    jobs: list of (source, file_ext) tuples, where source is a file path
+    or the raw upload bytes
+    profile: job profile definition to score against (built-in if None)
+    Returns one result per job, in input order. Each result holds either
+    'resume_text', 'scores', 'hits' and 'experience_years' or an 'error'
+    message.
+    """
+    if Config.PIPELINE_WORKERS <= 1 or len(jobs) <= 1:
+        return [_run_inline(source, file_ext, profile) for source, file_ext in jobs]
+
+    executor = get_executor()
+    try:
+        futures = [executor.submit(process_resume, source, file_ext, profile)
+                   for source, file_ext in jobs]
+    except BrokenProcessPool:
+        reset_executor(executor)
+        futures = []
+
+    results = []
+    broken = False
+    for index, job in enumerate(jobs):
+        if index >= len(futures):
+            results.append(process_single(*job, profile))
+            continue
+        try:
+            results.append(futures[index].result())
+        except BrokenProcessPool:
+            # A worker died; every unfinished future fails with it, so
+            # rerun those one by one to find the file that caused it.
+            if not broken:
+                reset_executor(executor)
+                broken = True
+            results.append(process_single(*job, profile))
+        except Exception as e:
+            results.append({'error': str(e)})
+
+    return results
@@ -1,4 +1,12 @@
 import re
+import string
+
+# Characters clean_text keeps besides whitespace; everything else is dropped
+_KEPT = set(string.ascii_letters + string.digits + '-+. ')
+_DROP_ASCII = str.maketrans('', '', ''.join(chr(c) for c in range(128) if chr(c) not in _KEPT))
+
+EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+PHONE_PATTERN = re.compile(r'[\+]?[(]?[0-9]{3}[)]?[-\s\.]?[0-9]{3}[-\s\.]?[0-9]{4,6}')
 
 class TextPreprocessor:
     """Text preprocessing utilities"""
@@ -6,11 +14,12 @@ class TextPreprocessor:
     @staticmethod
     def clean_text(text):
         """Clean and normalize text"""
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
-        # Remove special characters but keep some
-        text = re.sub(r'[^a-zA-Z0-9\s\-+\.]', '', text)
-        return text.strip()
+        # Collapse whitespace, then drop special characters but keep some;
+        # non-ASCII characters are dropped by the encode
+        text = ' '.join(text.split())
+        if not text.isascii():
+            text = text.encode('ascii', 'ignore').decode('ascii')
+        return text.translate(_DROP_ASCII).strip()
     
     @staticmethod
     def tokenize(text):
@@ -20,11 +29,26 @@ class TextPreprocessor:
     @staticmethod
     def extract_emails(text):
         """Extract email addresses from text"""
-        pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-        return re.findall(pattern, text)
+        return EMAIL_PATTERN.findall(text)
     
     @staticmethod
     def extract_phone_numbers(text):
         """Extract phone numbers from text"""
-        pattern = r'[\+]?[(]?[0-9]{3}[)]?[-\s\.]?[0-9]{3}[-\s\.]?[0-9]{4,6}'
-        return re.findall(pattern, text)
\ No newline at end of file
+        return PHONE_PATTERN.findall(text)
+    
+    @staticmethod
+    def analyze(text):
+        """
+        Cleaned text, tokens, emails and phone numbers of a text
+        
+        The text is cleaned once and tokenized from the cleaned form.
+        Contacts come from the raw text, as with extract_emails and
+        extract_phone_numbers; a text without '@' skips the email scan.
+        """
+        cleaned = TextPreprocessor.clean_text(text)
+        return {
+            'text': cleaned,
+            'tokens': TextPreprocessor.tokenize(cleaned),
+            'emails': EMAIL_PATTERN.findall(text) if '@' in text else [],
+            'phones': PHONE_PATTERN.findall(text)
+        }
\ No newline at end of file
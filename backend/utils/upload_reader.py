@@ -0,0 +1,44 @@
+import hashlib
+import io
+import os
+import tempfile
+from config import Config
+
+CHUNK_SIZE = 64 * 1024
+
+def read_upload(file, max_memory=None):
+    """
+    Stream an uploaded file, hashing it on the way.
+
+    Returns (content_hash, source). Uploads up to max_memory bytes are
+    kept in memory and source is their bytes. Larger uploads spill to a
+    uniquely named temp file in UPLOAD_FOLDER and source is its path; the
+    caller removes it when done.
+    """
+    if max_memory is None:
+        max_memory = Config.UPLOAD_SPOOL_MAX_SIZE
+
+    digest = hashlib.sha256()
+    buffer = io.BytesIO()
+    spill = None
+    try:
+        for chunk in iter(lambda: file.stream.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+            if spill is None and buffer.tell() + len(chunk) > max_memory:
+                spill = tempfile.NamedTemporaryFile(
+                    dir=Config.UPLOAD_FOLDER, prefix='upload_', delete=False
+                )
+                spill.write(buffer.getvalue())
+                buffer = None
+            (spill or buffer).write(chunk)
+    except Exception:
+        if spill is not None:
+            spill.close()
+            os.remove(spill.name)
+        raise
+
+    if spill is None:
+        return digest.hexdigest(), buffer.getvalue()
+
+    spill.close()
+    return digest.hexdigest(), spill.name
@@ -9,8 +9,21 @@ export const resumeService = {
         });
     },
     
-    getAll: () =>
-        api.get('/resumes'),
+    getPage: (params = {}) =>
+        api.get('/resumes', { params }),
+    
+    getAll: async () => {
+        // Follow the keyset cursor until the last page
+        const resumes = [];
+        let cursor = null;
+        let response;
+        do {
+            response = await api.get('/resumes', { params: { limit: 200, cursor } });
+            resumes.push(...response.data.resumes);
+            cursor = response.data.next_cursor;
+        } while (cursor);
+        return { ...response, data: { resumes } };
+    },
     
     getById: (id) =>
         api.get(`/resumes/${id}`),